@@ -0,0 +1,214 @@
+"""
+Summary statistics for Likert and rating scale questions.
+
+Answers are loaded once per survey and mapped to `OrdinalChoice.score`.
+When NumPy is installed the scores are held in arrays and summarized in
+vectorized form, otherwise the standard library is used.
+"""
+import statistics
+from collections import Counter, namedtuple
+from itertools import chain, islice, repeat
+
+from formly.models import Field, FieldResult, OrdinalChoice
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+SCALE_FIELD_TYPES = [Field.LIKERT_FIELD, Field.RATING_FIELD]
+
+ScoreSummary = namedtuple("ScoreSummary", [
+    "count",
+    "mean",
+    "median",
+    "stdev",
+    "top_box",
+    "bottom_box",
+    "distribution",
+])
+
+CrossTab = namedtuple("CrossTab", ["questions", "scores", "counts"])
+
+
+def _as_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _choice_pk(answer):
+    choice_pk = _as_int(answer.get("answer") if answer else None)
+    return -1 if choice_pk is None else choice_pk
+
+
+class ScaleAnswers(object):
+    """
+    Scores given to the Likert and rating questions of a survey.
+
+    `top_box` and `bottom_box` are the percentages of responses among the
+    `box_size` highest and lowest scores of each question's scale.
+    """
+
+    def __init__(self, survey, use_numpy=None):
+        self.survey = survey
+        self.use_numpy = numpy is not None if use_numpy is None else use_numpy
+        if self.use_numpy and numpy is None:
+            raise ImportError("NumPy is not installed")
+
+        self.questions = list(
+            survey.fields.filter(field_type__in=SCALE_FIELD_TYPES).order_by("page__page_num", "ordinal", "pk")
+        )
+        self.scale_scores = {}
+        scores_by_choice = {}
+        for scale_pk, choice_pk, score in OrdinalChoice.objects.filter(
+            scale__in=set(question.scale_id for question in self.questions if question.scale_id)
+        ).values_list("scale", "pk", "score"):
+            scores_by_choice[choice_pk] = score
+            self.scale_scores.setdefault(scale_pk, []).append(score)
+        for scores in self.scale_scores.values():
+            scores.sort()
+
+        results = FieldResult.objects.filter(survey=survey, question__in=self.questions)
+        if self.use_numpy:
+            question_pks, scores = self._load_arrays(results, scores_by_choice)
+        else:
+            question_pks = []
+            scores = []
+            for question_pk, answer in results.values_list("question_id", "answer").iterator():
+                score = scores_by_choice.get(_as_int(answer.get("answer") if answer else None))
+                if score is not None:
+                    question_pks.append(question_pk)
+                    scores.append(score)
+
+        self._scores = self._group(question_pks, scores)
+
+    def _load_arrays(self, results, scores_by_choice):
+        """
+        Stream the `(question, choice)` pairs of `results` into an array
+        sized by a count query and map the choices to scores in bulk
+        """
+        count = results.count()
+        rows = (
+            (question_pk, _choice_pk(answer))
+            for question_pk, answer in results.values_list("question_id", "answer").iterator()
+        )
+        # pad with unknown choices in case results were deleted since counting
+        loaded = numpy.fromiter(
+            islice(chain(rows, repeat((0, -1))), count),
+            dtype=[("question", numpy.int64), ("choice", numpy.int64)],
+            count=count
+        )
+
+        choice_pks = numpy.array(sorted(scores_by_choice), dtype=numpy.int64)
+        choice_scores = numpy.array([scores_by_choice[pk] for pk in choice_pks.tolist()], dtype=numpy.int64)
+        if not len(choice_pks):
+            return loaded["question"][:0], choice_scores
+        index = numpy.minimum(numpy.searchsorted(choice_pks, loaded["choice"]), len(choice_pks) - 1)
+        known = choice_pks[index] == loaded["choice"]
+        return loaded["question"][known], choice_scores[index[known]]
+
+    def _group(self, question_pks, scores):
+        if not self.use_numpy:
+            grouped = dict((question.pk, []) for question in self.questions)
+            for question_pk, score in zip(question_pks, scores):
+                grouped[question_pk].append(score)
+            return grouped
+
+        question_pks = numpy.asarray(question_pks, dtype=numpy.int64)
+        scores = numpy.asarray(scores, dtype=numpy.int64)
+        order = numpy.argsort(question_pks, kind="stable")
+        question_pks = question_pks[order]
+        scores = scores[order]
+        grouped = dict(
+            (question.pk, numpy.empty(0, dtype=numpy.int64)) for question in self.questions
+        )
+        boundaries = numpy.flatnonzero(numpy.diff(question_pks)) + 1
+        for chunk_pks, chunk in zip(numpy.split(question_pks, boundaries), numpy.split(scores, boundaries)):
+            if len(chunk):
+                grouped[int(chunk_pks[0])] = chunk
+        return grouped
+
+    def scores(self, question):
+        """
+        The scores given to `question`, as a NumPy array or a list
+        """
+        return self._scores.get(question.pk, [])
+
+    def summary(self, question, box_size=1):
+        if box_size < 1:
+            raise ValueError("box_size must be at least 1")
+        scores = self.scores(question)
+        scale = self.scale_scores.get(question.scale_id, [])
+        if not len(scores):
+            return ScoreSummary(0, None, None, None, None, None, {})
+
+        # a box as wide as the scale holds every score
+        box_size = min(box_size, len(scale))
+        top = scale[-box_size] if scale else None
+        bottom = scale[box_size - 1] if scale else None
+        if self.use_numpy:
+            values, counts = numpy.unique(scores, return_counts=True)
+            count = len(scores)
+            return ScoreSummary(
+                count=count,
+                mean=float(scores.mean()),
+                median=float(numpy.median(scores)),
+                stdev=float(scores.std(ddof=1)) if count > 1 else None,
+                top_box=100.0 * numpy.count_nonzero(scores >= top) / count if scale else None,
+                bottom_box=100.0 * numpy.count_nonzero(scores <= bottom) / count if scale else None,
+                distribution=dict(zip(values.tolist(), counts.tolist())),
+            )
+
+        count = len(scores)
+        return ScoreSummary(
+            count=count,
+            mean=float(statistics.mean(scores)),
+            median=float(statistics.median(scores)),
+            stdev=float(statistics.stdev(scores)) if count > 1 else None,
+            top_box=100.0 * sum(1 for score in scores if score >= top) / count if scale else None,
+            bottom_box=100.0 * sum(1 for score in scores if score <= bottom) / count if scale else None,
+            distribution=dict(sorted(Counter(scores).items())),
+        )
+
+    def summaries(self, box_size=1):
+        return dict(
+            (question.pk, self.summary(question, box_size=box_size))
+            for question in self.questions
+        )
+
+    def page_crosstab(self, page):
+        """
+        Count responses per score for each scale question on `page`; the
+        `counts` rows follow `questions` and the columns follow `scores`.
+        """
+        questions = [question for question in self.questions if question.page_id == page.pk]
+        columns = sorted(set(
+            score
+            for question in questions
+            for score in self.scale_scores.get(question.scale_id, [])
+        ))
+        if self.use_numpy:
+            counts = numpy.zeros((len(questions), len(columns)), dtype=numpy.int64)
+            column_scores = numpy.array(columns, dtype=numpy.int64)
+            for row, question in enumerate(questions):
+                scores = self.scores(question)
+                if len(scores) and len(columns):
+                    index = numpy.minimum(numpy.searchsorted(column_scores, scores), len(columns) - 1)
+                    # scores outside the page's scales have no column
+                    index = index[column_scores[index] == scores]
+                    counts[row] = numpy.bincount(index, minlength=len(columns))
+            return CrossTab(questions, columns, counts)
+
+        counts = []
+        for question in questions:
+            counter = Counter(self.scores(question))
+            counts.append([counter.get(score, 0) for score in columns])
+        return CrossTab(questions, columns, counts)
+
+    def page_crosstabs(self):
+        return dict(
+            (page.pk, self.page_crosstab(page))
+            for page in self.survey.pages.all()
+        )
@@ -23,6 +23,17 @@ def load_path_attr(path):
 class FormlyAppConf(AppConf):
 
     HOOKSET = "formly.hooks.FormlyDefaultHookset"
+    RESULTS_PAGE_SIZE = 100
+    SPEC_CACHE = "default"
+    SPEC_CACHE_TIMEOUT = 60 * 60 * 24
+    SPEC_LOCAL_CACHE_SIZE = 1000
+    SNAPSHOT_CACHE_SIZE = 100
+    SCALE_REGISTRY_TIMEOUT = 5
+    REMAP_BATCH_SIZE = 500
+    REMAP_PAGE_SIZE = 100
+    LAZY_MAPPINGS = False
+    MAPPING_CACHE_SIZE = 1000
+    ASYNC_VIEWS = False
 
     def configure_hookset(self, value):
         return load_path_attr(value)()
@@ -1,72 +1,204 @@
 from django import forms
+from django.db import IntegrityError, connection, transaction
 
-from formly.models import Field, FieldResult, SurveyResult
+from formly.conf import settings
+from formly.models import (
+    Field,
+    FieldResult,
+    Page,
+    QuestionStatistics,
+    SurveyResult,
+)
+from formly.utils.specs import get_page_spec
 
 
 class FieldResultMixin(object):
 
-    def save_result(self, field, user):
+    # Whether answers are saved outside of submitting their page
+    revealed = False
+
+    def get_survey_result(self, obj, user):
+        """
+        The `SurveyResult` of `user` for the survey of `obj`, a field or page
+        """
         if not hasattr(self, "_survey_result"):
             self._survey_result, _ = SurveyResult.objects.get_or_create(
-                survey=field.survey,
+                survey_id=obj.survey_id,
                 user=user
             )
+        return self._survey_result
 
-        if field.field_type == Field.MEDIA_FIELD:
-            defaults = {"answer": {"answer": ""}, "upload": self.cleaned_data[field.name]}
-        else:
-            defaults = {"answer": {"answer": self.cleaned_data[field.name]}, "upload": ""}
-
-        qs = FieldResult.objects.filter(
-            survey=field.survey,
-            result=self._survey_result,
-            question=field
-        )
-        if qs.exists():
-            result = qs.get()
-            result.answer = defaults["answer"]
-            result.upload = defaults["upload"]
-            result.save()
-        else:
-            result = FieldResult.objects.create(
-                survey=field.survey,
-                page=field.page,
-                result=self._survey_result,
-                question=field,
-                answer=defaults["answer"],
-                upload=defaults["upload"]
+    def answer_name(self, field):
+        """
+        The form field holding the answer to the `Field` model `field`
+        """
+        return field.name
+
+    def result_page_id(self, field):
+        """
+        The page answers to `field` are recorded against
+        """
+        return field.page_id
+
+    def question_mappings(self, fields):
+        """
+        The current `Field.mapping` of each multiple text question in
+        `fields`, by pk
+        """
+        return dict((field.pk, field.mapping) for field in fields if field.field_type == Field.MULTIPLE_TEXT)
+
+    def save_result(self, field, user):
+        return self.save_results([field], user)[0]
+
+    def save_results(self, fields, user):
+        """
+        Save the answers for `fields`, `Field` rows or the `FieldSpec`
+        they were asked with, with one read of the existing results and one
+        bulk insert/update, all inside a single transaction.
+        """
+        fields = list(fields)
+        if not fields:
+            return []
+
+        with transaction.atomic():
+            survey_result = self.get_survey_result(fields[0], user)
+            existing = dict(
+                (result.question_id, result)
+                for result in FieldResult.objects.filter(
+                    result=survey_result,
+                    question__in=[field.pk for field in fields]
+                )
             )
-        return result
+            mappings = self.question_mappings(fields)
+            upload_field = FieldResult._meta.get_field("upload")
+
+            results, created, updated, changes = [], [], [], []
+            for field in fields:
+                value = self.cleaned_data[self.answer_name(field)]
+                if field.field_type == Field.MEDIA_FIELD:
+                    answer, upload = {"answer": ""}, value
+                else:
+                    answer, upload = {"answer": value}, ""
+
+                result = existing.get(field.pk)
+                if result is None:
+                    result = FieldResult(
+                        survey_id=survey_result.survey_id,
+                        page_id=self.result_page_id(field),
+                        result=survey_result,
+                        revealed=self.revealed
+                    )
+                    created.append(result)
+                    old_answer = None
+                else:
+                    updated.append(result)
+                    old_answer = result.answer or {}
+                result.question_id = field.pk
+                result.answer = answer
+                result.upload = upload
+                if field.field_type == Field.MULTIPLE_TEXT:
+                    result._update_mapping(mappings.get(field.pk) or {})
+                results.append(result)
+                changes.append((field, old_answer, result.answer))
+
+            # bulk_update() skips pre_save(), which is what commits uploads
+            for result in updated:
+                upload_field.pre_save(result, False)
+            FieldResult.objects.bulk_create(created)
+            FieldResult.objects.bulk_update(updated, ["answer", "upload"])
+            QuestionStatistics.record(changes)
+        return results
 
 
 class PageForm(FieldResultMixin, forms.Form):
+    """
+    Form for a `Page`, or for a `PageSpec` from a published snapshot.
+    """
 
     def __init__(self, *args, **kwargs):
         self.page = kwargs.pop("page")
+        survey = kwargs.pop("survey", None)
         super(PageForm, self).__init__(*args, **kwargs)
-        for field in self.page.fields.all():
+        self.spec = get_page_spec(self.page, survey=survey)
+        for field in self.spec.fields:
             self.fields[field.name] = field.form_field()
-            targets = field.choices.filter(target__isnull=False)
-            if targets.count() > 0:
+            if field.targets:
                 self.fields[field.name].widget.attrs["data-reveal"] = ",".join([
-                    "{0}".format(target.pk) for target in targets
+                    "{0}".format(choice_pk) for choice_pk, _ in field.targets
                 ])
-                for target in targets:
-                    self.fields[target.target.name] = target.target.form_field()
-                    self.fields[target.target.name].widget.attrs["class"] = "hide"
-                    self.fields[target.target.name].widget.attrs["data-reveal-id"] = target.pk
+                for choice_pk, target in field.targets:
+                    self.fields[target.name] = target.form_field()
+                    self.fields[target.name].widget.attrs["class"] = "hide"
+                    self.fields[target.name].widget.attrs["data-reveal-id"] = choice_pk
+
+    def result_page_id(self, field):
+        return self.page_ids.get(field.pk, self.page.pk)
+
+    def question_mappings(self, fields):
+        pks = [field.pk for field in fields if field.field_type == Field.MULTIPLE_TEXT]
+        if not pks or settings.FORMLY_LAZY_MAPPINGS:
+            return {}
+        return dict(Field.objects.filter(pk__in=pks).values_list("pk", "mapping"))
 
     def save(self, user):
-        for field in self.page.fields.all():
-            self.save_result(field, user)
+        """
+        Save the answers to the questions as the form asked them and advance
+        the respondent's progress. Questions and pages of a published
+        snapshot that were deleted from the design since publishing no
+        longer have rows to record answers against: when the insert fails,
+        those answers are discarded, like the answers given before deletion.
+        """
+        fields = list(self.spec.fields)
+        self.page_ids = {}
+        with transaction.atomic():
+            survey_result = self.get_survey_result(self.page, user)
+            if isinstance(self.page, Page):
+                self.save_results(fields, user)
+            else:
+                try:
+                    with transaction.atomic():
+                        self.save_results(fields, user)
+                        if connection.features.can_defer_constraint_checks:
+                            # foreign keys are otherwise only checked on commit
+                            connection.check_constraints(table_names=[FieldResult._meta.db_table])
+                except IntegrityError:
+                    self.save_results(self.live_fields(fields), user)
+            survey_result.record_page(self.page)
+
+    def live_fields(self, fields):
+        """
+        The `fields` whose questions still exist, recorded against the page
+        when it still exists and against the question's page otherwise
+        """
+        live = dict(Field.objects.filter(pk__in=[field.pk for field in fields]).values_list("pk", "page"))
+        if Page.objects.filter(pk=self.page.pk).exists():
+            self.page_ids = {}
+        else:
+            self.page_ids = live
+        return [field for field in fields if field.pk in live and self.result_page_id(field) is not None]
 
 
 class TargetForm(FieldResultMixin, forms.Form):
 
+    revealed = True
+
     def __init__(self, *args, **kwargs):
-        self.target = kwargs.pop("choice").target
+        self.choice = kwargs.pop("choice")
+        self.target = self.choice.target
         super(TargetForm, self).__init__(*args, **kwargs)
-        self.fields[self.target.name] = self.target.form_field()
+        snapshot = self.target.survey.snapshot()
+        self.spec = snapshot.target(self.choice.pk) if snapshot is not None else None
+        if self.spec is None:
+            self.spec = self.target
+        self.fields[self.spec.name] = self.spec.form_field()
+
+    def result_page_id(self, field):
+        # Targets are not on a page; record them on the revealing question's,
+        # flagged as `revealed` so the page is not taken as completed
+        return self.target.page_id or self.choice.field.page_id
+
+    def question_mappings(self, fields):
+        return super(TargetForm, self).question_mappings([self.target])
 
     def save(self, user):
-        return self.save_result(self.target, user)
+        return self.save_result(self.spec, user)
@@ -0,0 +1,25 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from formly.models import Survey
+from formly.utils.cloning import survey_document
+
+
+class Command(BaseCommand):
+    help = "Write a survey's design (pages, fields, choices and scales) as a JSON document."
+
+    def add_arguments(self, parser):
+        parser.add_argument("survey_id", type=int)
+        parser.add_argument(
+            "--database",
+            default="default",
+            help="Database to read the survey from"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            survey = Survey.objects.using(options["database"]).get(pk=options["survey_id"])
+        except Survey.DoesNotExist:
+            raise CommandError("Survey {} does not exist".format(options["survey_id"]))
+        self.stdout.write(json.dumps(survey_document(survey), separators=(",", ":")))
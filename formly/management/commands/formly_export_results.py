@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from formly.models import Survey
+from formly.utils.exporting import EXPORT_FORMATS, iter_export, write_parquet
+
+
+class Command(BaseCommand):
+    help = "Export one row per survey respondent as CSV, NDJSON or Parquet."
+
+    def add_arguments(self, parser):
+        parser.add_argument("survey_id", type=int)
+        parser.add_argument(
+            "--format",
+            dest="export_format",
+            choices=sorted(EXPORT_FORMATS) + ["parquet"],
+            default="csv",
+        )
+        parser.add_argument(
+            "--output",
+            help="File to write to (default: stdout, required for parquet)"
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+        )
+
+    def handle(self, *args, **options):
+        try:
+            survey = Survey.objects.get(pk=options["survey_id"])
+        except Survey.DoesNotExist:
+            raise CommandError("Survey {} does not exist".format(options["survey_id"]))
+
+        if options["export_format"] == "parquet":
+            if not options["output"]:
+                raise CommandError("--output is required for parquet exports")
+            write_parquet(survey, options["output"], batch_size=options["chunk_size"])
+            return
+
+        chunks = iter_export(survey, options["export_format"], chunk_size=options["chunk_size"])
+        if options["output"]:
+            with open(options["output"], "w", newline="") as output:
+                for chunk in chunks:
+                    output.write(chunk)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
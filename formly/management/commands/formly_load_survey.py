@@ -0,0 +1,37 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from formly.utils.cloning import load_survey_document
+
+
+class Command(BaseCommand):
+    help = "Create a survey from a document written by formly_dump_survey in one or more databases."
+
+    def add_arguments(self, parser):
+        parser.add_argument("document", help="Path to the survey document")
+        parser.add_argument(
+            "--creator",
+            required=True,
+            help="Username of the survey creator in each target database"
+        )
+        parser.add_argument(
+            "--database",
+            action="append",
+            dest="databases",
+            help="Database to load the survey into; repeat for several (default: default)"
+        )
+
+    def handle(self, *args, **options):
+        with open(options["document"]) as document_file:
+            document = json.load(document_file)
+
+        User = get_user_model()
+        for using in options["databases"] or ["default"]:
+            try:
+                creator = User.objects.db_manager(using).get_by_natural_key(options["creator"])
+            except User.DoesNotExist:
+                raise CommandError("User {} does not exist in {}".format(options["creator"], using))
+            survey = load_survey_document(document, creator, using=using)
+            self.stdout.write("Loaded survey {} into {}".format(survey.pk, using))
@@ -0,0 +1,200 @@
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from django.urls import reverse
+
+from formly.models import Field, FieldResult, Survey
+from formly.utils.specs import get_page_spec
+
+
+def percentile(values, percent):
+    """
+    Nearest-rank percentile of an already sorted list
+    """
+    if not values:
+        return None
+    rank = max(int(round(percent / 100.0 * len(values) + 0.5)) - 1, 0)
+    return values[min(rank, len(values) - 1)]
+
+
+def answer_data(spec, rng):
+    """
+    POST data answering the `FieldSpec` `spec`, plus the pk of the chosen
+    choice when it reveals another question
+    """
+    name = spec.name
+    choice_pks = [pk for pk, _ in spec.choices]
+    if spec.field_type in [Field.RADIO_CHOICES, Field.SELECT_FIELD, Field.LIKERT_FIELD, Field.RATING_FIELD]:
+        if not choice_pks:
+            return {}, None
+        choice_pk = rng.choice(choice_pks)
+        targets = dict(spec.targets)
+        return {name: str(choice_pk)}, choice_pk if choice_pk in targets else None
+    if spec.field_type == Field.CHECKBOX_FIELD:
+        count = min(spec.maximum_choices or len(choice_pks), len(choice_pks))
+        return {name: [str(pk) for pk in rng.sample(choice_pks, rng.randint(min(count, 1), count))]}, None
+    if spec.field_type == Field.MULTIPLE_TEXT:
+        return dict(
+            ("{}_{}".format(name, index), "answer {}".format(rng.randint(1, 20)))
+            for index in range(spec.expected_answers)
+        ), None
+    if spec.field_type == Field.DATE_FIELD:
+        return {name: "2020-{:02d}-{:02d}".format(rng.randint(1, 12), rng.randint(1, 28))}, None
+    if spec.field_type == Field.BOOLEAN_FIELD:
+        return ({name: "on"} if rng.random() < 0.5 or spec.required else {}), None
+    if spec.field_type == Field.MEDIA_FIELD:
+        return {name: SimpleUploadedFile("loadtest.txt", b"formly load test", content_type="text/plain")}, None
+    return {name: "load test answer {}".format(rng.randint(1, 1000))}, None
+
+
+class Command(BaseCommand):
+    help = "Simulate respondents taking a survey and report latency percentiles per page."
+
+    def add_arguments(self, parser):
+        parser.add_argument("survey_id", type=int)
+        parser.add_argument("--respondents", type=int, default=100)
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=10,
+            help="Number of respondents taking the survey at the same time"
+        )
+        parser.add_argument(
+            "--host",
+            default="localhost",
+            help="Host header sent with each request; must be in ALLOWED_HOSTS"
+        )
+        parser.add_argument("--seed", type=int)
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Keep the respondents and their answers instead of deleting them afterwards"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            self.survey = Survey.objects.get(pk=options["survey_id"])
+        except Survey.DoesNotExist:
+            raise CommandError("Survey {} does not exist".format(options["survey_id"]))
+
+        self.host = options["host"]
+        self.seed = options["seed"] if options["seed"] is not None else random.randrange(2 ** 32)
+        self.timings = defaultdict(list)
+        self.errors = []
+        self.lock = threading.Lock()
+
+        User = get_user_model()
+        prefix = "formly-loadtest-{}-{}-".format(self.survey.pk, int(time.time()))
+        User.objects.bulk_create([
+            User(username="{}{}".format(prefix, index)) for index in range(options["respondents"])
+        ])
+        users = list(User.objects.filter(username__startswith=prefix).order_by("pk"))
+
+        started = time.perf_counter()
+        try:
+            if options["concurrency"] > 1:
+                with ThreadPoolExecutor(max_workers=options["concurrency"]) as executor:
+                    list(executor.map(self.run_respondent, users))
+            else:
+                for user in users:
+                    self.run_respondent(user, close_connections=False)
+            elapsed = time.perf_counter() - started
+        finally:
+            if not options["keep"]:
+                FieldResult.objects.filter(result__user__in=users).delete()
+                User.objects.filter(pk__in=[user.pk for user in users]).delete()
+
+        self.report(elapsed, len(users))
+
+    def run_respondent(self, user, close_connections=True):
+        try:
+            self.take_survey(user)
+        except Exception as e:
+            # One failing respondent should not abort the whole run
+            self.record_error(user, repr(e))
+        finally:
+            if close_connections:
+                connections.close_all()
+
+    def request(self, label, method, *args, **kwargs):
+        start = time.perf_counter()
+        response = method(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        with self.lock:
+            self.timings[label].append(elapsed)
+        return response
+
+    def take_survey(self, user):
+        rng = random.Random("{}-{}".format(self.seed, user.pk))
+        client = Client(HTTP_HOST=self.host)
+        client.force_login(user)
+        url = reverse("formly:take_survey", kwargs={"pk": self.survey.pk})
+        visited = set()
+
+        while True:
+            page = self.survey.current_page(user=user)
+            if page is None:
+                return
+            if page.pk in visited:
+                self.record_error(user, "page {} was not completed".format(page.pk))
+                return
+            visited.add(page.pk)
+            label = str(page)
+
+            response = self.request("GET {}".format(label), client.get, url)
+            if response.status_code != 200:
+                self.record_error(user, "GET {} returned {}".format(label, response.status_code))
+                return
+
+            data = {}
+            revealed = []
+            for spec in get_page_spec(page).fields:
+                answer, choice_pk = answer_data(spec, rng)
+                data.update(answer)
+                if choice_pk is not None:
+                    revealed.append((choice_pk, dict(spec.targets)[choice_pk]))
+
+            response = self.request("POST {}".format(label), client.post, url, data)
+            if response.status_code != 302:
+                self.record_error(user, "POST {} returned {}".format(label, response.status_code))
+                return
+
+            for choice_pk, target in revealed:
+                choice_url = reverse("formly:choice_question", kwargs={"pk": choice_pk})
+                answer, _ = answer_data(target, rng)
+                self.request("POST choice question", client.post, choice_url, answer)
+
+    def record_error(self, user, message):
+        with self.lock:
+            self.errors.append("{}: {}".format(user.get_username(), message))
+
+    def report(self, elapsed, respondents):
+        self.stdout.write("{} respondents in {:.2f}s (seed {})".format(respondents, elapsed, self.seed))
+        self.stdout.write("{:<40} {:>8} {:>9} {:>9} {:>9} {:>9}".format(
+            "request", "count", "p50 ms", "p95 ms", "p99 ms", "req/s"
+        ))
+        total = 0
+        for label in sorted(self.timings):
+            values = sorted(self.timings[label])
+            total += len(values)
+            self.stdout.write("{:<40} {:>8} {:>9.1f} {:>9.1f} {:>9.1f} {:>9.1f}".format(
+                label[:40],
+                len(values),
+                percentile(values, 50) * 1000,
+                percentile(values, 95) * 1000,
+                percentile(values, 99) * 1000,
+                len(values) / elapsed if elapsed else 0,
+            ))
+        self.stdout.write("Total throughput: {:.1f} requests/s".format(total / elapsed if elapsed else 0))
+        for error in self.errors[:20]:
+            self.stderr.write(error)
+        if self.errors:
+            self.stderr.write("{} respondents failed".format(len(self.errors)))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from formly.models import Field
+from formly.utils.remapping import materialize_mapping
+
+
+class Command(BaseCommand):
+    help = "Write the current answer mappings of multiple text questions into their results."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "survey_ids",
+            nargs="*",
+            type=int,
+            help="Only materialize mappings for these surveys (default: all surveys)"
+        )
+
+    def handle(self, *args, **options):
+        questions = Field.objects.filter(field_type=Field.MULTIPLE_TEXT)
+        if options["survey_ids"]:
+            questions = questions.filter(survey__in=options["survey_ids"])
+
+        total = 0
+        for question in questions.iterator():
+            total += materialize_mapping(question)
+        self.stdout.write("Materialized mappings for {} results".format(total))
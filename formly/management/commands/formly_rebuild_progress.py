@@ -0,0 +1,62 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from formly.models import FieldResult, Survey, SurveyResult
+from formly.utils.progress import SurveyProgress
+
+
+class Command(BaseCommand):
+    help = "Rebuild SurveyResult progress pointers from existing FieldResult data."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "survey_ids",
+            nargs="*",
+            type=int,
+            help="Only rebuild pointers for these surveys (default: all surveys)"
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+        )
+
+    def handle(self, *args, **options):
+        surveys = Survey.objects.all()
+        if options["survey_ids"]:
+            surveys = surveys.filter(pk__in=options["survey_ids"])
+
+        total = 0
+        for survey in surveys.iterator():
+            total += self.rebuild_survey(survey, options["batch_size"])
+        self.stdout.write("Rebuilt {} progress pointers".format(total))
+
+    def rebuild_survey(self, survey, batch_size):
+        completed = defaultdict(set)
+        answered = FieldResult.objects.page_answers().filter(survey=survey).values_list(
+            "result", "page"
+        ).distinct()
+        for result_pk, page_pk in answered.iterator():
+            completed[result_pk].add(page_pk)
+
+        progress = SurveyProgress(survey, user=None, completed=[])
+        count = 0
+        batch = []
+        with transaction.atomic():
+            for result in SurveyResult.objects.filter(survey=survey).iterator():
+                progress.completed = completed.get(result.pk, set())
+                result.completed_pages = sorted(progress.completed)
+                next_page = progress.next_page()
+                result.current_page_id = next_page.pk if next_page is not None else None
+                batch.append(result)
+                if len(batch) >= batch_size:
+                    count += self.flush(batch)
+                    batch = []
+            count += self.flush(batch)
+        return count
+
+    def flush(self, results):
+        SurveyResult.objects.bulk_update(results, ["completed_pages", "current_page"])
+        return len(results)
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from formly.models import Field, QuestionStatistics
+
+
+class Command(BaseCommand):
+    help = "Rebuild QuestionStatistics from existing FieldResult data."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "survey_ids",
+            nargs="*",
+            type=int,
+            help="Only rebuild statistics for these surveys (default: all surveys)"
+        )
+
+    def handle(self, *args, **options):
+        questions = Field.objects.all()
+        if options["survey_ids"]:
+            questions = questions.filter(survey__in=options["survey_ids"])
+
+        total = 0
+        for question in questions.iterator():
+            QuestionStatistics.rebuild(question)
+            total += 1
+        self.stdout.write("Rebuilt statistics for {} questions".format(total))
@@ -0,0 +1,29 @@
+# Generated by Django 3.1.14 on 2026-10-18 18:39
+
+from django.db import migrations, models
+import django.db.models.deletion
+import jsonfield.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('formly', '0012_fix_multi_text_answer_data'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='surveyresult',
+            name='completed_pages',
+            field=jsonfield.fields.JSONField(blank=True, default=None, null=True),
+        ),
+        migrations.AddField(
+            model_name='surveyresult',
+            name='current_page',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='formly.page'),
+        ),
+        migrations.AddIndex(
+            model_name='surveyresult',
+            index=models.Index(fields=['survey', 'user'], name='formly_surv_survey__b8cbe4_idx'),
+        ),
+    ]
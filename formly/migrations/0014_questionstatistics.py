@@ -0,0 +1,28 @@
+# Generated by Django 3.1.14 on 2026-10-18 18:44
+
+from django.db import migrations, models
+import django.db.models.deletion
+import jsonfield.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('formly', '0013_surveyresult_progress'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionStatistics',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('responses', models.PositiveIntegerField(default=0)),
+                ('choice_counts', jsonfield.fields.JSONField(blank=True, default=dict)),
+                ('score_histogram', jsonfield.fields.JSONField(blank=True, default=dict)),
+                ('question', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='statistics', to='formly.field')),
+            ],
+            options={
+                'verbose_name_plural': 'question statistics',
+            },
+        ),
+    ]
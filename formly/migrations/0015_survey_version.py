@@ -0,0 +1,35 @@
+# Generated by Django 3.1.14 on 2026-10-18 18:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import jsonfield.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('formly', '0014_questionstatistics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SurveyVersion',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField()),
+                ('created', models.DateTimeField(default=django.utils.timezone.now)),
+                ('snapshot', jsonfield.fields.JSONField()),
+                ('survey', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='versions', to='formly.survey')),
+            ],
+            options={
+                'ordering': ['survey', 'number'],
+                'unique_together': {('survey', 'number')},
+            },
+        ),
+        migrations.AddField(
+            model_name='survey',
+            name='published_version',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='formly.surveyversion'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.1.14 on 2026-10-18 18:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('formly', '0015_survey_version'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='field',
+            index=models.Index(fields=['page', 'ordinal'], name='formly_fiel_page_id_2824ff_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 3.1.14 on 2026-10-18 19:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('formly', '0016_field_page_ordinal_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NormalizedAnswer',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('text', models.TextField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('mapping', models.TextField(blank=True, default='')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='normalized_answers', to='formly.field')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='normalizedanswer',
+            index=models.Index(fields=['question', '-count'], name='formly_norm_questio_985c3e_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='normalizedanswer',
+            unique_together={('question', 'text')},
+        ),
+    ]
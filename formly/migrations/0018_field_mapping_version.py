@@ -0,0 +1,18 @@
+# Generated by Django 3.1.14 on 2026-10-18 19:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('formly', '0017_normalizedanswer'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='field',
+            name='mapping_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 3.1.14 on 2026-10-18 19:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+import jsonfield.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('formly', '0018_field_mapping_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='normalizedanswer',
+            name='signature',
+            field=jsonfield.fields.JSONField(blank=True, default=list),
+        ),
+        migrations.CreateModel(
+            name='NormalizedAnswerBand',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=32)),
+                ('answer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bands', to='formly.normalizedanswer')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='formly.field')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='normalizedanswerband',
+            index=models.Index(fields=['question', 'key'], name='formly_norm_questio_ece8c1_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='normalizedanswerband',
+            unique_together={('answer', 'key')},
+        ),
+    ]
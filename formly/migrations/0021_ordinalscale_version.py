@@ -0,0 +1,18 @@
+# Generated by Django 3.1.14 on 2026-10-18 19:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('formly', '0020_survey_design_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ordinalscale',
+            name='version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.1.14 on 2026-10-18 19:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('formly', '0021_ordinalscale_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fieldresult',
+            name='revealed',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 3.1.14 on 2026-10-18 19:42
+
+from django.db import migrations
+import jsonfield.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('formly', '0022_fieldresult_revealed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='questionstatistics',
+            name='pending_answers',
+            field=jsonfield.fields.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -1,10 +1,14 @@
 from __future__ import unicode_literals
 
+import threading
+from contextlib import contextmanager
+
 from django import forms
 from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.db import models
-from django.db.models import Max
+from django.db import models, transaction
+from django.db.models import Max, signals
+from django.dispatch import receiver
 from django.template.defaultfilters import slugify
 from django.urls import reverse
 from django.utils import timezone
@@ -14,6 +18,14 @@ from six import python_2_unicode_compatible
 
 from .fields import LimitedMultipleChoiceField, MultipleTextField
 from .forms.widgets import LikertSelect, MultiTextWidget, RatingSelect
+from .utils.cloning import duplicate_survey
+from .utils.pages import PageSequence
+from .utils.progress import SurveyProgress
+from .utils.remapping import answer_mapping, mapped_answers, normalize_answer
+from .utils.scales import bump_scales, invalidate_scales, scale_registry
+from .utils.similarity import band_keys, minhash
+from .utils.snapshots import build_snapshot, get_snapshot
+from .utils.specs import invalidate_scale_specs, invalidate_survey_specs
 
 
 @python_2_unicode_compatible
@@ -27,8 +39,21 @@ class OrdinalScale(models.Model):
 
     name = models.CharField(max_length=100)
     kind = models.CharField(max_length=6, choices=ORDINAL_KIND_CHOICES)
+    version = models.PositiveIntegerField(default=0, editable=False)
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get("update_fields") is None and not kwargs.get("force_insert"):
+            # `version` is only ever bumped in the database by `bump_scales`
+            kwargs["update_fields"] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != "version"
+            ]
+        return super(OrdinalScale, self).save(*args, **kwargs)
 
     def __str__(self):
+        scale = scale_registry(self._state.db or "default").scale(self.pk)
+        if scale is not None:
+            return str(scale)
         return "{} [{}]".format(self.name, ", ".join([str(c) for c in self.choices.order_by("score")]))
 
 
@@ -52,12 +77,32 @@ class Survey(models.Model):
     created = models.DateTimeField(default=timezone.now)
     updated = models.DateTimeField(default=timezone.now)
     published = models.DateTimeField(null=True, blank=True)
+    published_version = models.ForeignKey(
+        "SurveyVersion",
+        null=True,
+        blank=True,
+        related_name="+",
+        on_delete=models.SET_NULL
+    )
+    design_version = models.PositiveIntegerField(default=0, editable=False)
 
     def save(self, *args, **kwargs):
         if self.pk:
             self.updated = timezone.now()
+            if not self._state.adding and kwargs.get("update_fields") is None and not kwargs.get("force_insert"):
+                # `design_version` is only ever bumped in the database by
+                # `invalidate_survey_specs`, never written back from a
+                # possibly stale instance
+                kwargs["update_fields"] = [
+                    field.name for field in self._meta.concrete_fields
+                    if not field.primary_key and field.name != "design_version"
+                ]
         return super(Survey, self).save(*args, **kwargs)
 
+    def delete(self, *args, **kwargs):
+        with batch_removals():
+            return super(Survey, self).delete(*args, **kwargs)
+
     def __str__(self):
         return self.name  # pragma: no cover
 
@@ -67,57 +112,8 @@ class Survey(models.Model):
     def get_run_url(self):
         return reverse("formly:take_survey", kwargs={"pk": self.pk})
 
-    def duplicate(self):  # @@@ This could like use with some refactoring
-        survey = Survey.objects.get(pk=self.pk)
-        survey.pk = None
-        survey.save()
-        survey.pages.all().delete()
-
-        pages = {}
-        page_targets = []
-        choice_targets = []
-
-        for page in Survey.objects.get(pk=self.pk).pages.all():
-            orig_page_target = page.target
-            orig_page_pk = page.pk
-            page.pk = None
-            page.survey = survey
-            page.target = None
-            page.save()
-            pages[orig_page_pk] = page
-            if orig_page_target:
-                page_targets.append({
-                    "page": page,
-                    "orig_target_pk": orig_page_target.pk
-                })
-            for field in Page.objects.get(pk=orig_page_pk).fields.all():
-                orig_field_pk = field.pk
-                field.pk = None
-                field.survey = survey
-                field.page = page
-                field.save()
-                for choice in Field.objects.get(pk=orig_field_pk).choices.all():
-                    orig_target = choice.target
-                    choice.pk = None
-                    choice.field = field
-                    choice.target = None
-                    choice.save()
-                    if orig_target:
-                        choice_targets.append({
-                            "choice": choice,
-                            "orig_target_pk": orig_target.pk
-                        })
-
-        for page_target in page_targets:
-            page = page_target["page"]
-            page.target = pages[page_target["orig_target_pk"]]
-            page.save()
-        for choice_target in choice_targets:
-            choice = choice_target["choice"]
-            choice.target = pages[choice_target["orig_target_pk"]]
-            choice.save()
-
-        return survey
+    def duplicate(self):
+        return duplicate_survey(self)
 
     @property
     def fields(self):
@@ -126,7 +122,34 @@ class Survey(models.Model):
                 yield field
 
     def next_page(self, user):
-        return self.first_page().next_page(user=user)
+        return SurveyProgress(self, user).next_page()
+
+    def current_page(self, user):
+        """
+        Return the page the user should answer next using the progress
+        pointer stored on their `SurveyResult`, falling back to `next_page`
+        when no pointer has been recorded yet. A pointer marking the survey
+        as done is checked against the current page graph, so respondents
+        are offered pages added or made reachable after they finished.
+
+        Published surveys return a `PageSpec` from the published snapshot.
+        """
+        snapshot = self.snapshot()
+        if snapshot is None:
+            result = self.survey_results.filter(user=user).select_related("current_page").first()
+            if result is None or result.completed_pages is None:
+                return self.next_page(user=user)
+            if result.current_page is not None:
+                return result.current_page
+            completed = result.completed_pages
+        else:
+            pointer = self.survey_results.filter(user=user).values_list("current_page", "completed_pages").first()
+            if pointer is None or pointer[1] is None:
+                return self.next_page(user=user)
+            if pointer[0] is not None:
+                return snapshot.page(pointer[0]) or self.next_page(user=user)
+            completed = pointer[1]
+        return SurveyProgress(self, user, completed=completed).next_page()
 
     def first_page(self):
         if self.pages.count() == 0:
@@ -134,8 +157,47 @@ class Survey(models.Model):
         return self.pages.all()[0]
 
     def publish(self):
-        self.published = timezone.now()
-        self.save()
+        """
+        Stamp the survey as published and freeze its current design into a
+        new `SurveyVersion` that respondents are served from.
+        """
+        with transaction.atomic():
+            self.published = timezone.now()
+            self.save()
+            number = self.versions.aggregate(Max("number"))["number__max"] or 0
+            self.published_version = self.versions.create(
+                number=number + 1,
+                created=self.published,
+                snapshot=build_snapshot(self)
+            )
+            self.save(update_fields=["published_version"])
+        return self.published_version
+
+    def snapshot(self):
+        """
+        The `SurveySnapshot` of the published version, or `None` when the
+        survey has never been published.
+        """
+        if self.published_version_id is None:
+            return None
+        return get_snapshot(self.published_version_id, self.published, self._state.db or "default")
+
+
+class SurveyVersion(models.Model):
+    """
+    Immutable snapshot of a survey's design, written each time it is
+    published and never updated afterwards.
+    """
+    survey = models.ForeignKey(Survey, related_name="versions", on_delete=models.CASCADE)
+    number = models.PositiveIntegerField()
+    created = models.DateTimeField(default=timezone.now)
+    snapshot = JSONField()
+
+    class Meta:
+        unique_together = [
+            ("survey", "number")
+        ]
+        ordering = ["survey", "number"]
 
 
 @python_2_unicode_compatible
@@ -153,10 +215,21 @@ class Page(models.Model):
         ordering = ["survey", "page_num"]
 
     def save(self, *args, **kwargs):
-        if self.page_num is None:
-            max_page = self.survey.pages.aggregate(Max("page_num"))
-            self.page_num = (max_page.get("page_num__max") or 0) + 1
-        return super(Page, self).save(*args, **kwargs)
+        with transaction.atomic(using=kwargs.get("using") or self._state.db):
+            if self.page_num is None:
+                self.page_num = PageSequence(self.survey).next_page_num()
+            result = super(Page, self).save(*args, **kwargs)
+            invalidate_survey_specs(self.survey_id, self._state.db)
+        return result
+
+    def delete(self, *args, **kwargs):
+        # Pointers to this page would read as a completed survey once nulled
+        SurveyResult.objects.filter(current_page=self).update(completed_pages=None)
+        with batch_removals():
+            invalidate_survey_specs(self.survey_id, self._state.db)
+            result = super(Page, self).delete(*args, **kwargs)
+            PageSequence(self.survey).renumber()
+        return result
 
     def __str__(self):
         return self.label()  # pragma: no cover
@@ -171,31 +244,45 @@ class Page(models.Model):
         return reverse("formly:page_detail", kwargs={"pk": self.pk})
 
     def next_page(self, user):
-        target = self
-
-        if self.completed(user=user):
-            try:
-                target = self.survey.pages.get(
-                    page_num=self.page_num + 1
-                )
-            except Page.DoesNotExist:
-                target = None
+        return SurveyProgress(self.survey, user).next_page(start=self)
 
-            if self.target:
-                target = self.target
-
-            if target and target.completed(user=user):
-                target = target.next_page(user=user)
-
-        return target
+    def reorder_fields(self, field_pks=None):
+        """
+        Space the fields of the page `Field.ORDINAL_GAP` apart, keeping their
+        current order or following `field_pks`, which must list every field
+        on the page exactly once. Returns a dict of field pk to new ordinal.
+        """
+        fields = list(self.fields.order_by("ordinal", "pk").only("pk", "ordinal"))
+        if field_pks is not None:
+            fields_by_pk = dict((field.pk, field) for field in fields)
+            if sorted(field_pks) != sorted(fields_by_pk):
+                raise ValueError("field_pks must list every field on the page exactly once")
+            fields = [fields_by_pk[pk] for pk in field_pks]
+        for index, field in enumerate(fields, 1):
+            field.ordinal = index * Field.ORDINAL_GAP
+        with transaction.atomic(using=self._state.db):
+            Field.objects.bulk_update(fields, ["ordinal"])
+            invalidate_survey_specs(self.survey_id, self._state.db)
+        return dict((field.pk, field.ordinal) for field in fields)
 
     def completed(self, user):
-        return self.results.filter(result__user=user).count() > 0
+        return self.results.page_answers().filter(result__user=user).exists()
 
     def is_last_page(self):
         return self.next_page() is None
 
 
+class FieldQuerySet(models.QuerySet):
+
+    def with_choices(self):
+        """
+        Prefetch everything `form_field` needs for these fields and the
+        questions their choices reveal, so building forms for any number of
+        fields takes a fixed number of queries.
+        """
+        return self.prefetch_related("choices__target__choices")
+
+
 @python_2_unicode_compatible
 class Field(models.Model):
     TEXT_FIELD = 0
@@ -238,6 +325,14 @@ class Field(models.Model):
     expected_answers = models.PositiveSmallIntegerField(default=1)
 
     mapping = JSONField(blank=True, default=dict())
+    # bumped whenever `mapping` changes so cached lookups can be reused
+    mapping_version = models.PositiveIntegerField(default=0)
+
+    objects = FieldQuerySet.as_manager()
+
+    # Fields on a page are spaced ORDINAL_GAP apart so that moving one only
+    # rewrites its own ordinal; the page is renumbered once a gap runs out.
+    ORDINAL_GAP = 1024
 
     # def clean(self):
     #     super(Field, self).clean()
@@ -247,47 +342,82 @@ class Field(models.Model):
     #                 "A question not on a page must be a target of a choice from another question"
     #             )
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super(Field, cls).from_db(db, field_names, values)
+        if "mapping" in instance.__dict__:
+            # compared on save to tell whether `mapping_version` needs a bump
+            instance._loaded_mapping = dict(instance.mapping or {})
+        return instance
+
     def save(self, *args, **kwargs):
-        if not self.ordinal:
+        if self.ordinal is None:
             # Set ordinal, since full_clean() will fail if not set
             self.ordinal = 1
         self.full_clean()
         if not self.pk and self.page is not None:
-            self.ordinal = (self.page.fields.aggregate(
-                Max("ordinal")
-            )["ordinal__max"] or 0) + 1
-        return super(Field, self).save(*args, **kwargs)
+            last = self.page.fields.order_by("-ordinal").values_list("ordinal", flat=True).first()
+            self.ordinal = (last if last is not None else 0) + self.ORDINAL_GAP
+        loaded_mapping = None if self._state.adding else getattr(self, "_loaded_mapping", None)
+        remapped = loaded_mapping is not None and (self.mapping or {}) != loaded_mapping
+        if remapped:
+            # bumped in the database, where `apply_mapping` bumps it too
+            self.mapping_version = models.F("mapping_version") + 1
+        with transaction.atomic(using=kwargs.get("using") or self._state.db):
+            result = super(Field, self).save(*args, **kwargs)
+            invalidate_survey_specs(self.survey_id, self._state.db)
+        if remapped:
+            self.refresh_from_db(fields=["mapping_version"])
+            self._loaded_mapping = dict(self.mapping or {})
+        return result
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(using=self._state.db), batch_removals():
+            invalidate_survey_specs(self.survey_id, self._state.db)
+            return super(Field, self).delete(*args, **kwargs)
+
+    def _move_between(self, lower, upper):
+        """
+        Give the field an ordinal between the `(pk, ordinal)` neighbours
+        `lower` and `upper` (`None` for an open end), with a single update
+        unless the page first needs renumbering.
+        """
+        if lower is not None and upper is not None and upper[1] - lower[1] < 2:
+            ordinals = self.page.reorder_fields()
+            lower = (lower[0], ordinals[lower[0]])
+            upper = (upper[0], ordinals[upper[0]])
+        if lower is None:
+            ordinal = upper[1] - self.ORDINAL_GAP
+        elif upper is None:
+            ordinal = lower[1] + self.ORDINAL_GAP
+        else:
+            ordinal = (lower[1] + upper[1]) // 2
+        with transaction.atomic(using=self._state.db, savepoint=False):
+            Field.objects.filter(pk=self.pk).update(ordinal=ordinal)
+            invalidate_survey_specs(self.survey_id, self._state.db)
+        self.ordinal = ordinal
 
     def move_up(self):
-        try:
-            other_field = self.page.fields.order_by("-ordinal").filter(
-                ordinal__lt=self.ordinal
-            )[0]
-            existing = self.ordinal
-            other = other_field.ordinal
-            self.ordinal = other
-            other_field.ordinal = existing
-            other_field.save()
-            self.save()
-        except IndexError:
+        before = list(self.page.fields.filter(
+            ordinal__lt=self.ordinal
+        ).order_by("-ordinal").values_list("pk", "ordinal")[:2])
+        if not before:
             return
+        self._move_between(before[1] if len(before) > 1 else None, before[0])
 
     def move_down(self):
-        try:
-            other_field = self.page.fields.order_by("ordinal").filter(
-                ordinal__gt=self.ordinal
-            )[0]
-            existing = self.ordinal
-            other = other_field.ordinal
-            self.ordinal = other
-            other_field.ordinal = existing
-            other_field.save()
-            self.save()
-        except IndexError:
+        after = list(self.page.fields.filter(
+            ordinal__gt=self.ordinal
+        ).order_by("ordinal").values_list("pk", "ordinal")[:2])
+        if not after:
             return
+        self._move_between(after[0], after[1] if len(after) > 1 else None)
 
     class Meta:
         ordering = ["ordinal"]
+        indexes = [
+            models.Index(fields=["page", "ordinal"])
+        ]
 
     def __str__(self):
         return "%s of type %s on %s" % (
@@ -315,10 +445,8 @@ class Field(models.Model):
 
     def form_field(self):
         if self.field_type in [Field.LIKERT_FIELD, Field.RATING_FIELD]:
-            if self.scale:
-                choices = [(x.pk, x.label) for x in self.scale.choices.all().order_by("score")]
-            else:
-                choices = []
+            scale_choices = scale_registry(self._state.db or "default").scale_choices(self.scale_id)
+            choices = [(x.pk, x.label) for x in scale_choices]
         else:
             choices = [(x.pk, x.label) for x in self.choices.all()]
 
@@ -327,29 +455,36 @@ class Field(models.Model):
         return field
 
     def _get_field_class(self, choices):
-        """
-        Set field_class and field kwargs based on field type
-        """
-        field_class = forms.CharField
-        kwargs = dict(
-            label=self.label,
-            help_text=self.help_text,
-            required=self.required
-        )
-        field_type = FIELD_TYPES.get(self.field_type, {})
-        field_class = field_type.get("field_class", field_class)
-        kwargs.update(**field_type.get("kwargs", {}))
-
-        if self.field_type in [Field.CHECKBOX_FIELD, Field.SELECT_FIELD, Field.RADIO_CHOICES, Field.LIKERT_FIELD, Field.RATING_FIELD]:
-            kwargs.update({"choices": choices})
-            if self.field_type == Field.CHECKBOX_FIELD:
-                kwargs.update({"maximum_choices": self.maximum_choices})
-        elif self.field_type == Field.MULTIPLE_TEXT:
-            kwargs.update({
-                "fields_length": self.expected_answers,
-                "widget": MultiTextWidget(widgets_length=self.expected_answers),
-            })
-        return field_class, kwargs
+        return get_field_class(self, choices)
+
+
+def get_field_class(field, choices):
+    """
+    Set field_class and field kwargs based on field type
+
+    `field` may be a `Field` or any object exposing the same attributes,
+    such as a compiled `formly.utils.specs.FieldSpec`.
+    """
+    field_class = forms.CharField
+    kwargs = dict(
+        label=field.label,
+        help_text=field.help_text,
+        required=field.required
+    )
+    field_type = FIELD_TYPES.get(field.field_type, {})
+    field_class = field_type.get("field_class", field_class)
+    kwargs.update(**field_type.get("kwargs", {}))
+
+    if field.field_type in [Field.CHECKBOX_FIELD, Field.SELECT_FIELD, Field.RADIO_CHOICES, Field.LIKERT_FIELD, Field.RATING_FIELD]:
+        kwargs.update({"choices": choices})
+        if field.field_type == Field.CHECKBOX_FIELD:
+            kwargs.update({"maximum_choices": field.maximum_choices})
+    elif field.field_type == Field.MULTIPLE_TEXT:
+        kwargs.update({
+            "fields_length": field.expected_answers,
+            "widget": MultiTextWidget(widgets_length=field.expected_answers),
+        })
+    return field_class, kwargs
 
 
 FIELD_TYPES = {
@@ -424,7 +559,15 @@ class FieldChoice(models.Model):
 
     def save(self, *args, **kwargs):
         self.full_clean()
-        return super(FieldChoice, self).save(*args, **kwargs)
+        with transaction.atomic(using=kwargs.get("using") or self._state.db):
+            result = super(FieldChoice, self).save(*args, **kwargs)
+            invalidate_survey_specs(self.field.survey_id, self._state.db)
+        return result
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(using=self._state.db):
+            invalidate_survey_specs(self.field.survey_id, self._state.db)
+            return super(FieldChoice, self).delete(*args, **kwargs)
 
     def __str__(self):
         return self.label
@@ -435,6 +578,31 @@ class SurveyResult(models.Model):
     survey = models.ForeignKey(Survey, related_name="survey_results", on_delete=models.CASCADE)
     user = models.ForeignKey(settings.AUTH_USER_MODEL, related_name="survey_results", on_delete=models.CASCADE)
     date_submitted = models.DateTimeField(default=timezone.now)
+    # Progress pointer maintained by PageForm.save; `completed_pages` is None
+    # until progress has been recorded, and `current_page` is None once the
+    # survey is complete.
+    current_page = models.ForeignKey(Page, null=True, blank=True, related_name="+", on_delete=models.SET_NULL)
+    completed_pages = JSONField(null=True, blank=True, default=None)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["survey", "user"])
+        ]
+
+    def record_page(self, page):
+        """
+        Mark `page` as completed and move the pointer to the next page
+        """
+        progress = SurveyProgress(self.survey, self.user, completed=self.completed_pages)
+        progress.completed.add(page.pk)
+        self.completed_pages = sorted(progress.completed)
+        next_page = progress.next_page()
+        self.current_page_id = next_page.pk if next_page is not None else None
+        self.save(update_fields=["completed_pages", "current_page"])
+
+    def delete(self, *args, **kwargs):
+        with batch_removals():
+            return super(SurveyResult, self).delete(*args, **kwargs)
 
     def get_absolute_url(self):
         return reverse("survey_edit", kwargs={"pk": self.pk, "page": 1})
@@ -443,6 +611,23 @@ class SurveyResult(models.Model):
         return self.survey.name
 
 
+class FieldResultQuerySet(models.QuerySet):
+
+    def page_answers(self):
+        """
+        Results saved by submitting their page, which are the ones that mark
+        it completed; answers to revealed questions are left out.
+        """
+        return self.filter(revealed=False)
+
+    def delete(self):
+        with batch_removals():
+            return super(FieldResultQuerySet, self).delete()
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
 @python_2_unicode_compatible
 class FieldResult(models.Model):
     survey = models.ForeignKey(Survey, related_name="results", on_delete=models.CASCADE)  # Denorm
@@ -451,35 +636,86 @@ class FieldResult(models.Model):
     question = models.ForeignKey(Field, related_name="results", on_delete=models.CASCADE)
     upload = models.FileField(upload_to="formly/", blank=True)
     answer = JSONField(blank=True)  # @@@ I think this should be something different than a string
+    # Answered through `choice_question` rather than by submitting `page`,
+    # so it does not mark the page completed
+    revealed = models.BooleanField(default=False)
+
+    objects = FieldResultQuerySet.as_manager()
 
-    def _update_mapping(self):
-        answer = self.answer["answer"]
-        mapping = dict()
-        for ans in answer:
-            ans = ans.strip().upper()
-            if ans in self.question.mapping:
-                mapping[ans] = self.question.mapping[ans]
-        self.answer["mapping"] = mapping
+    @classmethod
+    def resolve_displays(cls, results):
+        """
+        Fetch every `FieldChoice` referenced by `results` with one `in_bulk`
+        and attach them to each result so that `answer_display` runs without
+        queries; `OrdinalChoice` labels come from the scale registry. Each
+        result's `question` should already be loaded.
+        """
+        choice_pks = set()
+        for result in results:
+            value = result.answer_value()
+            if value and result.question.needs_choices:
+                values = value if isinstance(value, list) else [value]
+                choice_pks.update(int(v) for v in values)
+
+        prefetched_choices = {
+            FieldChoice: FieldChoice.objects.in_bulk(choice_pks),
+        }
+        for result in results:
+            result.prefetched_choices = prefetched_choices
+        return results
+
+    def _update_mapping(self, mapping=None):
+        if settings.FORMLY_LAZY_MAPPINGS:
+            # mappings are resolved when the result is read
+            self.answer.pop("mapping", None)
+            return
+        if mapping is None:
+            mapping = self.question.mapping
+        self.answer["mapping"] = answer_mapping(self.answer["answer"], mapping)
 
     def save(self, *args, **kwargs):
         if self.question.field_type == Field.MULTIPLE_TEXT:
             self._update_mapping()
-        return super(FieldResult, self).save(*args, **kwargs)
+        old_answer = None
+        if self.pk:
+            old_answer = FieldResult.objects.filter(pk=self.pk).values_list("answer", flat=True).first()
+        with transaction.atomic():
+            result = super(FieldResult, self).save(*args, **kwargs)
+            QuestionStatistics.record([(self.question, old_answer, self.answer or {})])
+        return result
+
+    def delete(self, *args, **kwargs):
+        with batch_removals():
+            return super(FieldResult, self).delete(*args, **kwargs)
 
     def answer_value(self):
         if self.answer:
             return self.answer.get("answer")
 
+    def _get_choice(self, model, pk):
+        """
+        Look up a choice in `prefetched_choices` (keyed by model then pk),
+        falling back to a query when it was not prefetched.
+        """
+        choices = getattr(self, "prefetched_choices", {}).get(model, {})
+        if pk in choices:
+            return choices[pk]
+        return model.objects.get(pk=pk)
+
     def answer_display(self):
         val = self.answer_value()
         if val:
             if self.question.needs_choices:
                 if self.question.field_type == Field.CHECKBOX_FIELD:
-                    return ", ".join([str(FieldChoice.objects.get(pk=int(v))) for v in val])
-                return FieldChoice.objects.get(pk=int(val)).label
+                    return ", ".join([str(self._get_choice(FieldChoice, int(v))) for v in val])
+                return self._get_choice(FieldChoice, int(val)).label
             if self.question.field_type in [Field.LIKERT_FIELD, Field.RATING_FIELD]:
-                choice = OrdinalChoice.objects.get(pk=int(val))
+                choice = scale_registry(self._state.db or "default").choice(int(val))
+                if choice is None:
+                    choice = self._get_choice(OrdinalChoice, int(val))
                 return "{} ({})".format(choice.label, choice.score)
+            if self.question.field_type == Field.MULTIPLE_TEXT:
+                return mapped_answers(self.question, self.answer)
         return val
 
     def __str__(self):
@@ -487,3 +723,330 @@ class FieldResult(models.Model):
 
     class Meta:
         ordering = ["result", "question"]
+
+
+@python_2_unicode_compatible
+class QuestionStatistics(models.Model):
+    """
+    Running aggregates of the answers to a question, kept up to date as
+    `FieldResult` rows are saved and deleted.
+    """
+    question = models.OneToOneField(Field, related_name="statistics", on_delete=models.CASCADE)
+    responses = models.PositiveIntegerField(default=0)
+    # FieldChoice pk -> number of results selecting it
+    choice_counts = JSONField(blank=True, default=dict)
+    # OrdinalChoice score -> number of results with that score
+    score_histogram = JSONField(blank=True, default=dict)
+    # normalized text -> count change not yet applied to NormalizedAnswer
+    pending_answers = JSONField(blank=True, default=dict)
+
+    class Meta:
+        verbose_name_plural = "question statistics"
+
+    def __str__(self):
+        return str(self.question)  # pragma: no cover
+
+    @staticmethod
+    def _answer_values(answer):
+        value = answer.get("answer") if answer else None
+        if value in (None, ""):
+            return []
+        return value if isinstance(value, list) else [value]
+
+    def _apply(self, question, answer, delta, scores):
+        if answer is None:
+            return
+        self.responses = max(self.responses + delta, 0)
+        if question.needs_choices:
+            counts = self.choice_counts
+        elif question.field_type in [Field.LIKERT_FIELD, Field.RATING_FIELD]:
+            counts = self.score_histogram
+        else:
+            return
+        for value in self._answer_values(answer):
+            try:
+                key = int(value)
+            except (TypeError, ValueError):
+                continue
+            if counts is self.score_histogram:
+                if key not in scores:
+                    continue
+                key = scores[key]
+            key = str(key)
+            counts[key] = counts.get(key, 0) + delta
+            if counts[key] <= 0:
+                del counts[key]
+
+    def _pend(self, question, answer, delta):
+        if question.field_type != Field.MULTIPLE_TEXT:
+            return
+        pending = self.pending_answers
+        for text in NormalizedAnswer._texts(answer):
+            pending[text] = pending.get(text, 0) + delta
+            if not pending[text]:
+                del pending[text]
+
+    @classmethod
+    def record(cls, changes):
+        """
+        Apply `(question, old_answer, new_answer)` changes, where an answer
+        of `None` means the result did not exist before or no longer exists.
+        `question` may be a `Field` or the `FieldSpec` it was answered with.
+        Statistics rows for every affected question are locked, updated and
+        written back with a fixed number of queries. Changes to the distinct
+        answers of multiple text questions are left in `pending_answers` for
+        `NormalizedAnswer.refresh`.
+        """
+        changes = list(changes)
+        if not changes:
+            return
+
+        ordinal_pks = set()
+        for question, old_answer, new_answer in changes:
+            if question.field_type in [Field.LIKERT_FIELD, Field.RATING_FIELD]:
+                for value in cls._answer_values(old_answer) + cls._answer_values(new_answer):
+                    try:
+                        ordinal_pks.add(int(value))
+                    except (TypeError, ValueError):
+                        pass
+        scores = dict(OrdinalChoice.objects.filter(pk__in=ordinal_pks).values_list("pk", "score")) if ordinal_pks else {}
+
+        questions = dict((question.pk, question) for question, _, _ in changes)
+        answered = set(question.pk for question, _, new_answer in changes if new_answer is not None)
+        with transaction.atomic():
+            locked = cls.objects.select_for_update().filter(question__in=list(questions))
+            statistics = dict((stats.question_id, stats) for stats in locked)
+            # Only answers create statistics: removing results must not add
+            # rows for a question that may be being deleted with them
+            missing = answered - set(statistics)
+            if missing:
+                cls.objects.bulk_create([cls(question_id=pk) for pk in missing], ignore_conflicts=True)
+                statistics = dict((stats.question_id, stats) for stats in locked.all())
+
+            for question, old_answer, new_answer in changes:
+                stats = statistics.get(question.pk)
+                if stats is None:
+                    continue
+                stats._apply(question, old_answer, -1, scores)
+                stats._apply(question, new_answer, 1, scores)
+                stats._pend(question, old_answer, -1)
+                stats._pend(question, new_answer, 1)
+            cls.objects.bulk_update(
+                list(statistics.values()),
+                ["responses", "choice_counts", "score_histogram", "pending_answers"]
+            )
+
+    @classmethod
+    def rebuild(cls, question):
+        """
+        Recompute the statistics for `question` from its results
+        """
+        with transaction.atomic():
+            cls.objects.filter(question=question).delete()
+            stats = cls(question=question)
+            scores = dict(OrdinalChoice.objects.filter(scale_id=question.scale_id).values_list("pk", "score"))
+            for answer in question.results.values_list("answer", flat=True).iterator():
+                stats._apply(question, answer or {}, 1, scores)
+            stats.save()
+            NormalizedAnswer.rebuild(question)
+        return stats
+
+
+@python_2_unicode_compatible
+class NormalizedAnswer(models.Model):
+    """
+    A distinct normalized answer to a multiple text question, with the
+    number of times it was given and what `Field.mapping` maps it to.
+    Saving answers only adds to `QuestionStatistics.pending_answers`;
+    `refresh` brings the counts up to date when they are read.
+    """
+    question = models.ForeignKey(Field, related_name="normalized_answers", on_delete=models.CASCADE)
+    text = models.TextField()
+    count = models.PositiveIntegerField(default=0)
+    mapping = models.TextField(blank=True, default="")
+    # MinHash of the answer's trigrams, see `formly.utils.similarity`
+    signature = JSONField(blank=True, default=list)
+
+    class Meta:
+        unique_together = [("question", "text")]
+        indexes = [models.Index(fields=["question", "-count"])]
+
+    def __str__(self):
+        return self.text
+
+    @staticmethod
+    def _texts(answer):
+        values = answer.get("answer") if answer else None
+        if not isinstance(values, list):
+            return []
+        return [text for text in (normalize_answer(value) for value in values) if text]
+
+    @classmethod
+    def refresh(cls, question):
+        """
+        Apply the answer count changes pending on the statistics of
+        `question`, with a fixed number of queries
+        """
+        with transaction.atomic():
+            stats = QuestionStatistics.objects.select_for_update().filter(question=question).first()
+            if stats is None or not stats.pending_answers:
+                return
+            deltas = stats.pending_answers
+            locked = cls.objects.select_for_update().filter(question=question, text__in=list(deltas))
+            existing = dict((answer.text, answer) for answer in locked)
+            missing = set(text for text, delta in deltas.items() if delta > 0) - set(existing)
+            if missing:
+                cls.objects.bulk_create(
+                    [
+                        cls(
+                            question=question,
+                            text=text,
+                            mapping=question.mapping.get(text, ""),
+                            signature=minhash(text)
+                        )
+                        for text in missing
+                    ],
+                    ignore_conflicts=True
+                )
+                existing = dict((answer.text, answer) for answer in locked.all())
+                NormalizedAnswerBand.index([existing[text] for text in missing])
+
+            changed = []
+            removed = []
+            for text, delta in deltas.items():
+                answer = existing.get(text)
+                if answer is None:
+                    continue
+                answer.count = max(answer.count + delta, 0)
+                if answer.count:
+                    changed.append(answer)
+                else:
+                    removed.append(answer.pk)
+            cls.objects.bulk_update(changed, ["count"])
+            if removed:
+                cls.objects.filter(pk__in=removed).delete()
+            stats.pending_answers = {}
+            stats.save(update_fields=["pending_answers"])
+
+    @classmethod
+    def rebuild(cls, question):
+        """
+        Recount the normalized answers of `question` from its results
+        """
+        with transaction.atomic():
+            cls.objects.filter(question=question).delete()
+            if question.field_type != Field.MULTIPLE_TEXT:
+                return
+            counts = dict()
+            for answer in question.results.values_list("answer", flat=True).iterator():
+                for text in cls._texts(answer):
+                    counts[text] = counts.get(text, 0) + 1
+            cls.objects.bulk_create(
+                [
+                    cls(
+                        question=question,
+                        text=text,
+                        count=count,
+                        mapping=question.mapping.get(text, ""),
+                        signature=minhash(text)
+                    )
+                    for text, count in counts.items()
+                ],
+                batch_size=500
+            )
+            NormalizedAnswerBand.index(cls.objects.filter(question=question).iterator())
+
+
+@python_2_unicode_compatible
+class NormalizedAnswerBand(models.Model):
+    """
+    One locality-sensitive hashing band of a `NormalizedAnswer` signature.
+    Answers sharing a band key are candidates for the same remapping.
+    """
+    answer = models.ForeignKey(NormalizedAnswer, related_name="bands", on_delete=models.CASCADE)
+    question = models.ForeignKey(Field, related_name="+", on_delete=models.CASCADE)  # Denorm
+    key = models.CharField(max_length=32)
+
+    class Meta:
+        unique_together = [("answer", "key")]
+        indexes = [models.Index(fields=["question", "key"])]
+
+    def __str__(self):
+        return self.key  # pragma: no cover
+
+    @classmethod
+    def index(cls, answers):
+        """
+        Store the band keys of `answers`, which must have been saved
+        """
+        cls.objects.bulk_create(
+            [
+                cls(answer_id=answer.pk, question_id=answer.question_id, key=key)
+                for answer in answers
+                for key in band_keys(answer.signature)
+            ],
+            batch_size=500,
+            ignore_conflicts=True
+        )
+
+
+@receiver(signals.post_save, sender=OrdinalScale)
+def handle_scale_save(sender, instance, using, **kwargs):
+    bump_scales([instance.pk], using)
+
+
+@receiver(signals.post_delete, sender=OrdinalScale)
+def handle_scale_removal(sender, using, **kwargs):
+    invalidate_scales(using)
+
+
+@receiver(signals.post_save, sender=OrdinalChoice)
+@receiver(signals.post_delete, sender=OrdinalChoice)
+def handle_scale_choice_change(sender, instance, using, **kwargs):
+    bump_scales([instance.scale_id], using)
+    invalidate_scale_specs(instance.scale_id, using)
+
+
+@receiver(signals.pre_delete, sender=OrdinalScale)
+def handle_scale_delete(sender, instance, using, **kwargs):
+    # Questions on the scale lose it once it is gone, so bump their surveys
+    # while they can still be found
+    invalidate_scale_specs(instance.pk, using)
+
+
+_removals = threading.local()
+
+
+@contextmanager
+def batch_removals():
+    """
+    Collect the answers of the `FieldResult` rows deleted inside the block
+    and remove them from the statistics with one `QuestionStatistics.record`
+    call once the deletion has succeeded, in the same transaction. Results
+    deleted outside of a batch, such as by a cascade from a deleted user,
+    are removed one at a time as they are deleted.
+    """
+    if getattr(_removals, "pending", None) is not None:
+        yield
+        return
+    _removals.pending = []
+    try:
+        with transaction.atomic():
+            yield
+            pending = _removals.pending
+            questions = Field.objects.in_bulk(set(pk for pk, _ in pending))
+            # questions deleted along with their results are skipped
+            QuestionStatistics.record(
+                (questions[pk], answer, None) for pk, answer in pending if pk in questions
+            )
+    finally:
+        _removals.pending = None
+
+
+@receiver(signals.pre_delete, sender=FieldResult)
+def handle_result_delete(sender, instance, using, **kwargs):
+    pending = getattr(_removals, "pending", None)
+    if pending is not None:
+        pending.append((instance.question_id, instance.answer or {}))
+    else:
+        QuestionStatistics.record([(instance.question, instance.answer or {}, None)])
@@ -0,0 +1,7 @@
+from django.dispatch import Signal
+
+# Sent by `formly.utils.instrumentation.phase` when a phase of a view has
+# run. The sender is the name of the view ("take_survey", "survey_results",
+# "field_reorder", ...) and the arguments are `phase`, `request`, `duration`
+# (in seconds) and `queries` (the number of database queries it ran).
+view_phase = Signal()
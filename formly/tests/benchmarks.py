@@ -0,0 +1,234 @@
+"""
+Cost benchmarks for the run, design and results views.
+
+`run_benchmarks` builds a survey of the requested size with the factories
+in `formly.tests.factories`, requests each hot path twice through the test
+client and records the query count, wall time and peak Python memory of
+the second (warm) request. `runbenchmarks.py` at the root of the repository
+runs them against a test database and compares the results with
+`benchmark_baseline.json`.
+"""
+import json
+import os
+import time
+import tracemalloc
+from collections import OrderedDict, namedtuple
+from functools import partial
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from formly.models import Field, FieldResult, NormalizedAnswer, SurveyResult
+
+from .factories import (
+    FieldChoiceFactory,
+    FieldFactory,
+    PageFactory,
+    SurveyFactory,
+)
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "benchmark_baseline.json")
+
+BenchmarkSize = namedtuple("BenchmarkSize", ["pages", "fields", "choices", "respondents"])
+Measurement = namedtuple("Measurement", ["status", "queries", "seconds", "peak_kb"])
+
+DEFAULT_SIZE = BenchmarkSize(pages=5, fields=10, choices=5, respondents=50)
+
+
+def build_survey(creator, size):
+    """
+    Create a survey with `size.pages` pages of `size.fields` questions and
+    `size.respondents` respondents who answered every page. The first
+    question of each page is multiple choice with `size.choices` choices,
+    the first of which reveals another question; the others alternate
+    between one-line text and multiple text answers.
+    """
+    survey = SurveyFactory(user=creator)
+    pages = []
+    for _ in range(size.pages):
+        page = PageFactory(survey=survey)
+        radio = FieldFactory(survey=survey, page=page, field_type=Field.RADIO_CHOICES)
+        target = FieldFactory(survey=survey, page=None, field_type=Field.TEXT_FIELD)
+        for index in range(size.choices):
+            FieldChoiceFactory(field=radio, target=target if index == 0 else None)
+        for index in range(size.fields - 1):
+            field_type = Field.MULTIPLE_TEXT if index % 2 == 0 else Field.TEXT_FIELD
+            FieldFactory(survey=survey, page=page, field_type=field_type, expected_answers=2)
+        pages.append(page)
+
+    User = get_user_model()
+    User.objects.bulk_create([
+        User(username="respondent-{}-{}".format(survey.pk, index))
+        for index in range(size.respondents)
+    ])
+    respondents = User.objects.filter(username__startswith="respondent-{}-".format(survey.pk))
+    SurveyResult.objects.bulk_create([
+        SurveyResult(survey=survey, user=user) for user in respondents
+    ])
+    fields = list(survey.fields.filter(page__isnull=False).prefetch_related("choices"))
+    results = []
+    for index, survey_result in enumerate(SurveyResult.objects.filter(survey=survey)):
+        for field in fields:
+            results.append(FieldResult(
+                survey=survey,
+                page_id=field.page_id,
+                result=survey_result,
+                question=field,
+                answer={"answer": _answer(field, index)},
+            ))
+    FieldResult.objects.bulk_create(results, batch_size=500)
+    for field in fields:
+        NormalizedAnswer.rebuild(field)
+    return survey
+
+
+def _answer(field, index):
+    if field.field_type == Field.RADIO_CHOICES:
+        choices = list(field.choices.all())
+        return str(choices[index % len(choices)].pk)
+    if field.field_type == Field.MULTIPLE_TEXT:
+        return ["answer-{}".format(index % 7), "answer-{}".format(index % 3)]
+    return "text {}".format(index)
+
+
+def _post_data(page):
+    data = {}
+    for field in page.fields.all():
+        if field.field_type == Field.RADIO_CHOICES:
+            data[field.name] = str(field.choices.all()[0].pk)
+        elif field.field_type == Field.MULTIPLE_TEXT:
+            for index in range(field.expected_answers):
+                data["{}_{}".format(field.name, index)] = "answer-{}".format(index)
+        else:
+            data[field.name] = "text"
+    return data
+
+
+def scenarios(survey, creator):
+    """
+    Map benchmark names to functions that take the iteration number and
+    return a callable making one request, so that logging in is not
+    measured and requests changing state can use a fresh respondent.
+    """
+    User = get_user_model()
+    page = survey.pages.all()[0]
+    radio = page.fields.get(field_type=Field.RADIO_CHOICES)
+    choice = radio.choices.filter(target__isnull=False)[0]
+    multiple_text = page.fields.filter(field_type=Field.MULTIPLE_TEXT).first() or radio
+    post_data = _post_data(page)
+
+    def client_for(user):
+        client = Client()
+        client.force_login(user)
+        return client
+
+    def respondent(name):
+        return User.objects.get_or_create(username="bench-{}-{}".format(survey.pk, name))[0]
+
+    designer = client_for(creator)
+    run_url = reverse("formly:take_survey", kwargs={"pk": survey.pk})
+    remap_url = reverse("formly:survey_results_remap", args=[multiple_text.pk, "ANSWER-0"])
+
+    choice_url = reverse("formly:choice_question", kwargs={"pk": choice.pk})
+    results_url = reverse("formly:survey_results", kwargs={"pk": survey.pk})
+    duplicate_url = reverse("formly:survey_duplicate", kwargs={"pk": survey.pk})
+    field_url = reverse("formly:field_update", kwargs={"pk": radio.pk})
+
+    return OrderedDict([
+        ("take_survey_get", lambda i: partial(client_for(respondent("get-{}".format(i))).get, run_url)),
+        ("take_survey_post", lambda i: partial(client_for(respondent("post-{}".format(i))).post, run_url, post_data)),
+        ("choice_question", lambda i: partial(designer.get, choice_url)),
+        ("survey_results", lambda i: partial(designer.get, results_url)),
+        ("remap_get", lambda i: partial(designer.get, remap_url)),
+        ("remap_post", lambda i: partial(designer.post, remap_url, {"mapping": ["ANSWER-1"]})),
+        ("survey_duplicate", lambda i: partial(designer.post, duplicate_url)),
+        ("field_update", lambda i: partial(designer.get, field_url)),
+    ])
+
+
+def measure(request):
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            response = request()
+            seconds = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return Measurement(response.status_code, len(queries), round(seconds, 4), peak // 1024)
+
+
+def run_benchmarks(size=DEFAULT_SIZE, only=None):
+    """
+    Build a survey of `size` and return an `OrderedDict` of `Measurement`
+    per benchmark name, optionally limited to the names in `only`.
+    """
+    creator = get_user_model().objects.get_or_create(username="bench-creator")[0]
+    survey = build_survey(creator, size)
+    results = OrderedDict()
+    for name, prepare in scenarios(survey, creator).items():
+        if only and name not in only:
+            continue
+        prepare(0)()
+        results[name] = measure(prepare(1))
+    return results
+
+
+def load_baseline(path=BASELINE_PATH):
+    if not os.path.exists(path):
+        return None
+    with open(path) as baseline:
+        return json.load(baseline)
+
+
+def save_baseline(size, results, path=BASELINE_PATH):
+    with open(path, "w") as baseline:
+        json.dump(
+            {
+                "size": size._asdict(),
+                "results": OrderedDict(
+                    (name, measurement._asdict()) for name, measurement in results.items()
+                ),
+            },
+            baseline,
+            indent=2
+        )
+        baseline.write("\n")
+
+
+def compare(size, results, baseline, memory_tolerance=0.5, time_tolerance=None):
+    """
+    Return a message for every benchmark that regressed past `baseline`:
+    any extra query, peak memory above `memory_tolerance` and, when given,
+    wall time above `time_tolerance` (both as a fraction of the baseline).
+    A baseline recorded for another survey size is reported as an error
+    rather than compared.
+    """
+    if baseline is None:
+        return []
+    if baseline["size"] != size._asdict():
+        return ["survey size {} does not match the baseline's {}".format(
+            dict(size._asdict()), baseline["size"]
+        )]
+    regressions = []
+    for name, measurement in results.items():
+        expected = baseline["results"].get(name)
+        if expected is None:
+            continue
+        if measurement.queries > expected["queries"]:
+            regressions.append("{}: {} queries (baseline {})".format(
+                name, measurement.queries, expected["queries"]
+            ))
+        if measurement.peak_kb > expected["peak_kb"] * (1 + memory_tolerance):
+            regressions.append("{}: {} KiB peak memory (baseline {})".format(
+                name, measurement.peak_kb, expected["peak_kb"]
+            ))
+        if time_tolerance is not None and measurement.seconds > expected["seconds"] * (1 + time_tolerance):
+            regressions.append("{}: {}s (baseline {}s)".format(
+                name, measurement.seconds, expected["seconds"]
+            ))
+    return regressions
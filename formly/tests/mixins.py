@@ -1,4 +1,6 @@
-from test_plus.test import TestCase
+from django.test import TransactionTestCase
+
+from test_plus.test import BaseTestCase, TestCase
 
 from formly.tests.factories import (
     FieldChoiceFactory,
@@ -78,3 +80,10 @@ class TestHelperMixin(object):
 
 class SimpleTests(TestCase, TestHelperMixin):
     pass
+
+
+class TransactionTests(TransactionTestCase, BaseTestCase, TestHelperMixin):
+    """
+    For views that query from worker threads, which only see committed data
+    """
+    pass
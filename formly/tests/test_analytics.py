@@ -0,0 +1,74 @@
+from unittest import skipIf
+
+from ..analytics import ScaleAnswers, numpy
+from ..models import Field
+from .mixins import SimpleTests
+
+
+class AnalyticsTests(SimpleTests):
+
+    def setUp(self):
+        self.user = self.make_user("test_user")
+        self.scale = self._ordinal_scale()
+        self.survey = self._survey()
+        self.page = self._page()
+        self.choices = dict(
+            (score, self._ordinal_choice(label="label {}".format(score), score=score))
+            for score in range(1, 6)
+        )
+        self.field = self._field(page=self.page, field_type=Field.RATING_FIELD, scale=self.scale)
+        self.unanswered = self._field(page=self.page, field_type=Field.LIKERT_FIELD, scale=self.scale)
+        for index, score in enumerate([5, 4, 4, 2]):
+            result = self._surveyresult(survey=self.survey, user=self.make_user("taker{}".format(index)))
+            self._fieldresult(
+                survey=self.survey,
+                page=self.page,
+                result=result,
+                answer={"answer": str(self.choices[score].pk)}
+            )
+
+    def check_answers(self, answers):
+        summary = answers.summary(self.field)
+        self.assertEqual(summary.count, 4)
+        self.assertEqual(summary.mean, 3.75)
+        self.assertEqual(summary.median, 4.0)
+        self.assertAlmostEqual(summary.stdev, 1.258305739)
+        self.assertEqual(summary.top_box, 25.0)
+        self.assertEqual(summary.bottom_box, 0.0)
+        self.assertEqual(summary.distribution, {2: 1, 4: 2, 5: 1})
+        self.assertEqual(answers.summary(self.unanswered).count, 0)
+
+        crosstab = answers.page_crosstab(self.page)
+        self.assertEqual(crosstab.questions, [self.field, self.unanswered])
+        self.assertEqual(crosstab.scores, [1, 2, 3, 4, 5])
+        self.assertEqual([list(row) for row in crosstab.counts], [[0, 1, 0, 2, 1], [0, 0, 0, 0, 0]])
+
+    def test_pure_python(self):
+        self.check_answers(ScaleAnswers(self.survey, use_numpy=False))
+
+    @skipIf(numpy is None, "NumPy is not installed")
+    def test_numpy(self):
+        self.check_answers(ScaleAnswers(self.survey, use_numpy=True))
+
+    def check_foreign_scores(self, use_numpy):
+        other_scale = self._ordinal_scale()
+        outside = self._ordinal_choice(scale=other_scale, label="outside", score=0)
+        self._field(page=self._page(), field_type=Field.RATING_FIELD, scale=other_scale)
+        result = self._surveyresult(survey=self.survey, user=self.make_user("outside"))
+        self._fieldresult(survey=self.survey, page=self.page, result=result, answer={"answer": str(outside.pk)})
+
+        answers = ScaleAnswers(self.survey, use_numpy=use_numpy)
+        crosstab = answers.page_crosstab(self.page)
+        self.assertEqual([list(row) for row in crosstab.counts], [[0, 1, 0, 2, 1], [0, 0, 0, 0, 0]])
+
+        summary = answers.summary(self.field, box_size=10)
+        self.assertEqual((summary.top_box, summary.bottom_box), (80.0, 100.0))
+        with self.assertRaises(ValueError):
+            answers.summary(self.field, box_size=0)
+
+    def test_foreign_scores_pure_python(self):
+        self.check_foreign_scores(use_numpy=False)
+
+    @skipIf(numpy is None, "NumPy is not installed")
+    def test_foreign_scores_numpy(self):
+        self.check_foreign_scores(use_numpy=True)
@@ -0,0 +1,52 @@
+from .benchmarks import (
+    DEFAULT_SIZE,
+    BenchmarkSize,
+    Measurement,
+    compare,
+    load_baseline,
+    run_benchmarks,
+)
+from .mixins import SimpleTests, TransactionTests
+
+
+class BenchmarkTests(SimpleTests):
+
+    def test_run_benchmarks(self):
+        """Ensure every benchmark scenario runs against a small survey"""
+        results = run_benchmarks(BenchmarkSize(pages=2, fields=3, choices=2, respondents=3))
+        self.assertIn("take_survey_post", results)
+        for name, measurement in results.items():
+            self.assertLess(measurement.status, 400, name)
+            self.assertGreater(measurement.queries, 0, name)
+
+    def test_compare(self):
+        """Ensure extra queries and a different survey size are reported"""
+        size = BenchmarkSize(pages=1, fields=1, choices=1, respondents=1)
+        baseline = {
+            "size": size._asdict(),
+            "results": {"a": {"status": 200, "queries": 3, "seconds": 0.1, "peak_kb": 100}},
+        }
+        self.assertEqual(compare(size, {"a": Measurement(200, 3, 5.0, 120)}, baseline), [])
+        self.assertEqual(
+            compare(size, {"a": Measurement(200, 4, 0.1, 100)}, baseline),
+            ["a: 4 queries (baseline 3)"]
+        )
+        self.assertEqual(len(compare(size, {"a": Measurement(200, 3, 5.0, 100)}, baseline, time_tolerance=1)), 1)
+        self.assertEqual(
+            compare(size._replace(pages=2), {"a": Measurement(200, 3, 0.1, 100)}, baseline),
+            ["survey size {'pages': 2, 'fields': 1, 'choices': 1, 'respondents': 1} "
+             "does not match the baseline's {'pages': 1, 'fields': 1, 'choices': 1, 'respondents': 1}"]
+        )
+
+
+class BaselineTests(TransactionTests):
+    """
+    Outside of a test transaction, so that atomic blocks are counted as
+    they are by `runbenchmarks.py`
+    """
+
+    def test_baseline_queries(self):
+        """Ensure no benchmark makes more queries than the recorded baseline"""
+        results = run_benchmarks(DEFAULT_SIZE)
+        # memory and time depend on the test runner and the machine
+        self.assertEqual(compare(DEFAULT_SIZE, results, load_baseline(), memory_tolerance=float("inf")), [])
@@ -0,0 +1,208 @@
+import datetime
+import tempfile
+from unittest import skipIf
+
+from django.core.management import call_command
+
+from six import StringIO
+
+from ..models import (
+    Field,
+    FieldResult,
+    OrdinalScale,
+    QuestionStatistics,
+    Survey,
+    SurveyResult,
+)
+from ..utils.exporting import pyarrow
+from ..utils.remapping import apply_mapping
+from .mixins import SimpleTests
+
+
+class CommandTests(SimpleTests):
+
+    def setUp(self):
+        self.user = self.make_user("test_user")
+
+    def test_rebuild_progress(self):
+        """Ensure progress pointers are rebuilt from existing answers"""
+        self.survey = self._survey()
+        page1 = self._page()
+        page2 = self._page()
+        self.field = self._field(page=page1)
+        finished = self._surveyresult(survey=self.survey)
+        started = self._surveyresult(survey=self.survey, user=self.make_user("started"))
+        for page in [page1, page2]:
+            self._fieldresult(survey=self.survey, page=page, result=finished, answer={"answer": ""})
+        self._fieldresult(survey=self.survey, page=page1, result=started, answer={"answer": ""})
+
+        out = StringIO()
+        call_command("formly_rebuild_progress", self.survey.pk, stdout=out)
+        self.assertIn("Rebuilt 2 progress pointers", out.getvalue())
+
+        finished.refresh_from_db()
+        self.assertEqual(finished.completed_pages, sorted([page1.pk, page2.pk]))
+        self.assertIsNone(finished.current_page)
+        started.refresh_from_db()
+        self.assertEqual(started.completed_pages, [page1.pk])
+        self.assertEqual(started.current_page, page2)
+
+    def test_rebuild_progress_revealed_answer(self):
+        """Ensure answering a revealed question does not complete its page"""
+        self.survey = self._survey()
+        page = self._page()
+        self.field = self._field(page=page, field_type=Field.RADIO_CHOICES)
+        target = self._field(page=None, label="why")
+        choice = self._fieldchoice(target=target)
+        survey_taker = self.make_user("survey_taker")
+        with self.login(survey_taker):
+            self.post("formly:choice_question", pk=choice.pk, data={target.name: "Because"})
+            self.response_200()
+
+        call_command("formly_rebuild_progress", self.survey.pk, stdout=StringIO())
+        result = SurveyResult.objects.get(survey=self.survey, user=survey_taker)
+        self.assertEqual(result.completed_pages, [])
+        self.assertEqual(result.current_page, page)
+        self.assertEqual(self.survey.current_page(user=survey_taker), page)
+
+    def test_export_results(self):
+        """Ensure results are exported to stdout"""
+        self.survey = self._survey()
+        page = self._page()
+        self.field = self._field(page=page, label="Name")
+        result = self._surveyresult(survey=self.survey)
+        self._fieldresult(survey=self.survey, page=page, result=result, answer={"answer": "Joe"})
+
+        out = StringIO()
+        call_command("formly_export_results", self.survey.pk, "--format", "ndjson", stdout=out)
+        self.assertIn('"name": "Joe"', out.getvalue())
+
+    @skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_export_results_parquet(self):
+        """Ensure Parquet exports are typed per field type"""
+        self.survey = self._survey()
+        page = self._page()
+        self.field = self._field(page=page, label="Colors", field_type=Field.CHECKBOX_FIELD)
+        choice = self._fieldchoice()
+        boolean = self._field(page=page, label="Agree", field_type=Field.BOOLEAN_FIELD)
+        date = self._field(page=page, label="Born", field_type=Field.DATE_FIELD)
+        other_date = self._field(page=page, label="Born", field_type=Field.DATE_FIELD)
+        result = self._surveyresult(survey=self.survey)
+        self._fieldresult(survey=self.survey, page=page, result=result, answer={"answer": [str(choice.pk)]})
+        self._fieldresult(question=boolean, survey=self.survey, page=page, result=result, answer={"answer": True})
+        self._fieldresult(question=date, survey=self.survey, page=page, result=result, answer={"answer": "2018-02-14"})
+        self._fieldresult(question=other_date, survey=self.survey, page=page, result=result, answer={"answer": "2019-03-01"})
+
+        with tempfile.NamedTemporaryFile(suffix=".parquet") as output:
+            call_command("formly_export_results", self.survey.pk, "--format", "parquet", "--output", output.name)
+            table = pyarrow.parquet.read_table(output.name)
+
+        row = table.to_pylist()[0]
+        self.assertEqual(row["colors"], [choice.pk])
+        self.assertIs(row["agree"], True)
+        self.assertEqual(row["born-{}".format(date.pk)], datetime.date(2018, 2, 14))
+        self.assertEqual(row["born-{}".format(other_date.pk)], datetime.date(2019, 3, 1))
+
+    def test_rebuild_statistics(self):
+        """Ensure statistics are rebuilt from existing answers"""
+        self.survey = self._survey()
+        page = self._page()
+        self.field = self._field(page=page)
+        result = self._surveyresult(survey=self.survey)
+        self._fieldresult(survey=self.survey, page=page, result=result, answer={"answer": "Joe"})
+        QuestionStatistics.objects.all().delete()
+
+        out = StringIO()
+        call_command("formly_rebuild_statistics", stdout=out)
+        self.assertIn("Rebuilt statistics for 1 questions", out.getvalue())
+        self.assertEqual(QuestionStatistics.objects.get(question=self.field).responses, 1)
+
+    def test_materialize_mappings(self):
+        """Ensure mappings made with lazy mappings are written into results"""
+        self.survey = self._survey()
+        page = self._page()
+        self.field = self._field(page=page, field_type=Field.MULTIPLE_TEXT, expected_answers=2)
+        result = self._surveyresult(survey=self.survey)
+        with self.settings(FORMLY_LAZY_MAPPINGS=True):
+            fieldresult = self._fieldresult(
+                survey=self.survey, page=page, result=result, answer={"answer": ["thiing", "tang"]}
+            )
+            apply_mapping(self.field, {"THIING": "THING"})
+        self.assertNotIn("mapping", FieldResult.objects.get(pk=fieldresult.pk).answer)
+
+        out = StringIO()
+        call_command("formly_materialize_mappings", stdout=out)
+        self.assertIn("Materialized mappings for 1 results", out.getvalue())
+        self.assertEqual(FieldResult.objects.get(pk=fieldresult.pk).answer["mapping"], {"THIING": "THING"})
+
+        out = StringIO()
+        call_command("formly_materialize_mappings", self.survey.pk, stdout=out)
+        self.assertIn("Materialized mappings for 0 results", out.getvalue())
+
+    def test_dump_and_load_survey(self):
+        """Ensure a survey document round trips through the commands"""
+        self.survey = self._survey()
+        page1 = self._page()
+        page2 = self._page()
+        page1.target = page2
+        page1.save()
+        self.field = self._field(page=page1, field_type=Field.RADIO_CHOICES, label="pick")
+        target = self._field(page=None, label="why")
+        self._fieldchoice(label="a", target=target)
+        scale = self._ordinal_scale()
+        self._ordinal_choice(scale=scale, label="low", score=1)
+        self._field(page=page2, field_type=Field.RATING_FIELD, scale=scale, label="rate")
+
+        out = StringIO()
+        call_command("formly_dump_survey", self.survey.pk, stdout=out)
+        with tempfile.NamedTemporaryFile("w", suffix=".json") as document:
+            document.write(out.getvalue())
+            document.flush()
+            out = StringIO()
+            call_command("formly_load_survey", document.name, "--creator", self.user.username, stdout=out)
+
+        loaded = Survey.objects.exclude(pk=self.survey.pk).get()
+        self.assertIn("Loaded survey {} into default".format(loaded.pk), out.getvalue())
+        pages = list(loaded.pages.all())
+        self.assertEqual(pages[0].target, pages[1])
+        choice = loaded.fields.get(label="pick").choices.get()
+        self.assertEqual(choice.target, loaded.fields.get(label="why"))
+        self.assertEqual(loaded.fields.get(label="rate").scale, scale)
+        self.assertEqual(OrdinalScale.objects.count(), 1)
+
+    def test_loadtest(self):
+        """Ensure simulated respondents complete every page and are removed"""
+        self.survey = self._survey()
+        page1 = self._page()
+        self.field = self._field(page=page1, field_type=Field.RADIO_CHOICES, label="pick", required=True)
+        target = self._field(page=None, label="why")
+        self._fieldchoice(label="a", target=target)
+        colors = self._field(page=page1, field_type=Field.CHECKBOX_FIELD, label="colors")
+        self._fieldchoice(field=colors, label="red")
+        page2 = self._page()
+        self._field(page=page2, field_type=Field.MULTIPLE_TEXT, label="names", expected_answers=2)
+        self._field(page=page2, field_type=Field.DATE_FIELD, label="born")
+        self._field(page=page2, field_type=Field.BOOLEAN_FIELD, label="agree")
+        self._field(page=page2, field_type=Field.MEDIA_FIELD, label="photo", required=True)
+
+        out = StringIO()
+        err = StringIO()
+        with tempfile.TemporaryDirectory() as media_root, self.settings(MEDIA_ROOT=media_root):
+            call_command(
+                "formly_loadtest",
+                self.survey.pk,
+                "--respondents", "3",
+                "--concurrency", "1",
+                "--host", "testserver",
+                "--seed", "1",
+                stdout=out,
+                stderr=err
+            )
+        self.assertEqual(err.getvalue(), "")
+        output = out.getvalue()
+        self.assertIn("3 respondents", output)
+        self.assertRegex(output, r"POST Page 1 +3 ")
+        self.assertRegex(output, r"POST Page 2 +3 ")
+        self.assertRegex(output, r"POST choice question +3 ")
+        self.assertFalse(self.survey.survey_results.exists())
+        self.assertEqual(QuestionStatistics.objects.get(question=self.field).responses, 0)
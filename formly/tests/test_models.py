@@ -1,10 +1,30 @@
 import datetime
 
 from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.db.models import F, signals
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from mock import patch
 
+from ..models import (
+    Field,
+    FieldResult,
+    NormalizedAnswer,
+    NormalizedAnswerBand,
+    OrdinalChoice,
+    OrdinalScale,
+    QuestionStatistics,
+    Survey,
+    SurveyResult,
+)
+from ..utils import remapping
+from ..utils.pages import PageSequence
+from ..utils.progress import SurveyProgress
+from ..utils.remapping import apply_mapping
+from ..utils.scales import scale_registry
+from ..utils.similarity import similar_answers
 from .mixins import SimpleTests
 
 
@@ -23,6 +43,12 @@ class ModelTests(SimpleTests):
         expected = "{} [first (1), middle (2), last (3)]".format(self.scale.name)
         self.assertEqual(str(self.scale), expected)
 
+    def test_ordinal_scale_save_preset_pk(self):
+        """Ensure a new scale with a preset primary key is inserted"""
+        scale = OrdinalScale(pk=1000, name="preset", kind=OrdinalScale.ORDINAL_KIND_LIKERT)
+        scale.save()
+        self.assertEqual(OrdinalScale.objects.get(pk=1000).name, "preset")
+
     def test_ordinal_scale_unique_label(self):
         """Ensure scale and choice label uniqueness is enforced"""
         label = "label"
@@ -65,6 +91,12 @@ class ModelTests(SimpleTests):
         survey.save()
         self.assertEqual(survey.updated, fake_now)
 
+    def test_survey_save_preset_pk(self):
+        """Verify a new survey with a preset primary key is inserted"""
+        survey = Survey(pk=1000, name="preset", creator=self.user)
+        survey.save()
+        self.assertEqual(Survey.objects.get(pk=1000).name, "preset")
+
     def test_page_unspecified_page_num(self):
         """Ensure `page_num` is set as expected"""
         self.survey = self._survey()
@@ -103,6 +135,24 @@ class ModelTests(SimpleTests):
         field2.refresh_from_db()
         self.assertTrue(field2.ordinal < field1.ordinal)
 
+    def test_field_move_rebalances(self):
+        """Ensure moves only touch the moved field until a gap runs out"""
+        self.survey = self._survey()
+        page1 = self._page()
+        fields = [self._field(page=page1) for _ in range(3)]
+        self.assertEqual([f.ordinal for f in fields], [1024, 2048, 3072])
+        with self.assertNumQueries(3):
+            fields[2].move_up()
+        self.assertEqual(fields[2].ordinal, 1536)
+
+        Field.objects.filter(pk=fields[2].pk).update(ordinal=1025)
+        fields[1].move_up()
+        order = list(page1.fields.order_by("ordinal").values_list("pk", "ordinal"))
+        self.assertEqual(order, [(fields[0].pk, 1024), (fields[1].pk, 1536), (fields[2].pk, 2048)])
+
+        fields[0].move_up()
+        self.assertEqual(fields[0].ordinal, 1024)
+
     def test_field_move_down(self):
         self.survey = self._survey()
         page1 = self._page()
@@ -112,3 +162,481 @@ class ModelTests(SimpleTests):
         field1.refresh_from_db()
         field2.refresh_from_db()
         self.assertTrue(field2.ordinal < field1.ordinal)
+
+    def test_survey_progress_published_pages(self):
+        """Ensure a published survey's live pages are read once per design version"""
+        self.survey = self._survey()
+        page1 = self._page()
+        page2 = self._page()
+        self.survey.publish()
+        SurveyProgress(Survey.objects.get(pk=self.survey.pk), self.user)
+
+        with CaptureQueriesContext(connection) as queries:
+            progress = SurveyProgress(Survey.objects.get(pk=self.survey.pk), self.user)
+        self.assertEqual([page.pk for page in progress.pages], [page1.pk, page2.pk])
+        self.assertFalse([query for query in queries if 'FROM "formly_page"' in query["sql"]])
+
+        page1.delete()
+        progress = SurveyProgress(Survey.objects.get(pk=self.survey.pk), self.user)
+        self.assertEqual([page.pk for page in progress.pages], [page2.pk])
+
+    def test_survey_next_page(self):
+        """Ensure next page follows page order, targets and completion"""
+        self.survey = self._survey()
+        pages = [self._page() for _ in range(5)]
+        pages[1].target = pages[3]
+        pages[1].save()
+        self.field = self._field(page=pages[0])
+        result = self._surveyresult(survey=self.survey)
+
+        self.assertEqual(self.survey.next_page(user=self.user), pages[0])
+
+        for page in pages[:2]:
+            self._fieldresult(survey=self.survey, page=page, result=result, answer={"answer": ""})
+        with self.assertNumQueries(2):
+            self.assertEqual(self.survey.next_page(user=self.user), pages[3])
+        self.assertEqual(pages[2].next_page(user=self.user), pages[2])
+
+        for page in pages[3:]:
+            self._fieldresult(survey=self.survey, page=page, result=result, answer={"answer": ""})
+        self.assertIsNone(self.survey.next_page(user=self.user))
+
+    def test_field_result_resolve_displays(self):
+        """Ensure answer labels are resolved with one query per choice model"""
+        self.survey = self._survey()
+        page = self._page()
+        result = self._surveyresult(survey=self.survey)
+        radio = self._field(page=page, field_type=Field.RADIO_CHOICES)
+        choice = self._fieldchoice(field=radio)
+        rating = self._field(page=page, field_type=Field.RATING_FIELD, scale=self.scale)
+        ordinal_choice = self._ordinal_choice(label="good", score=1)
+        self._fieldresult(question=radio, survey=self.survey, page=page, result=result, answer={"answer": str(choice.pk)})
+        self._fieldresult(question=rating, survey=self.survey, page=page, result=result, answer={"answer": str(ordinal_choice.pk)})
+
+        scale_registry()
+        with self.assertNumQueries(2):
+            results = FieldResult.resolve_displays(list(FieldResult.objects.select_related("question").order_by("question")))
+            displays = [r.answer_display() for r in results]
+        self.assertEqual(displays, [choice.label, "good (1)"])
+
+    def test_scale_registry(self):
+        """Ensure scale choices are served from the registry until they change"""
+        self.survey = self._survey()
+        page = self._page()
+        likert = self._field(page=page, field_type=Field.LIKERT_FIELD, scale=self.scale)
+        rating = self._field(page=page, field_type=Field.RATING_FIELD, scale=self.scale)
+        high = self._ordinal_choice(label="high", score=2)
+        self._ordinal_choice(label="low", score=1)
+
+        registry = scale_registry()
+        self.assertEqual(registry.score(high.pk), 2)
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                [label for _, label in likert.form_field().choices],
+                ["low", "high"]
+            )
+            rating.form_field()
+            self.assertEqual(str(self.scale), "{} [low (1), high (2)]".format(self.scale.name))
+
+        high.label = "top"
+        high.save()
+        self.assertIsNot(scale_registry(), registry)
+        self.assertEqual(
+            [label for _, label in likert.form_field().choices],
+            ["low", "top"]
+        )
+
+        # Another process renames a choice: this one notices once its
+        # registry is older than the timeout
+        registry = scale_registry()
+        OrdinalChoice.objects.filter(pk=high.pk).update(label="peak")
+        OrdinalScale.objects.filter(pk=self.scale.pk).update(version=F("version") + 1)
+        self.assertIs(scale_registry(), registry)
+        self.assertEqual(scale_registry(max_age=0).choice(high.pk).label, "peak")
+
+        # Saving a stale scale instance keeps the bumped version
+        version = OrdinalScale.objects.get(pk=self.scale.pk).version
+        self.scale.save()
+        self.assertEqual(OrdinalScale.objects.get(pk=self.scale.pk).version, version + 1)
+
+    def test_question_statistics(self):
+        """Ensure statistics follow results as they are saved and deleted"""
+        self.survey = self._survey()
+        page = self._page()
+        self.field = self._field(page=page, field_type=Field.CHECKBOX_FIELD)
+        choice1 = self._fieldchoice()
+        choice2 = self._fieldchoice()
+        rating = self._field(page=page, field_type=Field.RATING_FIELD, scale=self.scale)
+        low = self._ordinal_choice(label="low", score=1)
+        high = self._ordinal_choice(label="high", score=5)
+
+        result1 = self._surveyresult(survey=self.survey)
+        checked = self._fieldresult(survey=self.survey, page=page, result=result1, answer={"answer": [str(choice1.pk), str(choice2.pk)]})
+        self._fieldresult(question=rating, survey=self.survey, page=page, result=result1, answer={"answer": str(low.pk)})
+        result2 = self._surveyresult(survey=self.survey, user=self.make_user("other"))
+        self._fieldresult(survey=self.survey, page=page, result=result2, answer={"answer": [str(choice1.pk)]})
+        self._fieldresult(question=rating, survey=self.survey, page=page, result=result2, answer={"answer": str(high.pk)})
+
+        stats = QuestionStatistics.objects.get(question=self.field)
+        self.assertEqual(stats.responses, 2)
+        self.assertEqual(stats.choice_counts, {str(choice1.pk): 2, str(choice2.pk): 1})
+        self.assertEqual(QuestionStatistics.objects.get(question=rating).score_histogram, {"1": 1, "5": 1})
+
+        checked.answer = {"answer": [str(choice2.pk)]}
+        checked.save()
+        stats.refresh_from_db()
+        self.assertEqual(stats.responses, 2)
+        self.assertEqual(stats.choice_counts, {str(choice1.pk): 1, str(choice2.pk): 1})
+
+        result2.delete()
+        stats.refresh_from_db()
+        self.assertEqual(stats.responses, 1)
+        self.assertEqual(stats.choice_counts, {str(choice2.pk): 1})
+        self.assertEqual(QuestionStatistics.objects.get(question=rating).score_histogram, {"1": 1})
+
+        rebuilt = QuestionStatistics.rebuild(self.field)
+        self.assertEqual(rebuilt.responses, 1)
+        self.assertEqual(rebuilt.choice_counts, stats.choice_counts)
+
+    def test_question_statistics_cascades(self):
+        """Ensure statistics follow results removed by cascades and queryset deletes"""
+        self.survey = self._survey()
+        page = self._page()
+        self.field = self._field(page=page, field_type=Field.RADIO_CHOICES)
+        choice = self._fieldchoice()
+        text = self._field(page=page, field_type=Field.MULTIPLE_TEXT, expected_answers=1)
+        users = [self.make_user("taker{}".format(index)) for index in range(3)]
+        for user in users:
+            result = self._surveyresult(survey=self.survey, user=user)
+            self._fieldresult(survey=self.survey, page=page, result=result, answer={"answer": str(choice.pk)})
+            self._fieldresult(question=text, survey=self.survey, page=page, result=result, answer={"answer": ["blue"]})
+
+        users[0].delete()
+        stats = QuestionStatistics.objects.get(question=self.field)
+        self.assertEqual((stats.responses, stats.choice_counts), (2, {str(choice.pk): 2}))
+        NormalizedAnswer.refresh(text)
+        self.assertEqual(NormalizedAnswer.objects.get(question=text).count, 2)
+
+        SurveyResult.objects.filter(user=users[1]).delete()
+        stats.refresh_from_db()
+        self.assertEqual((stats.responses, stats.choice_counts), (1, {str(choice.pk): 1}))
+        NormalizedAnswer.refresh(text)
+        self.assertEqual(NormalizedAnswer.objects.get(question=text).count, 1)
+
+        text.delete()
+        self.assertFalse(NormalizedAnswer.objects.exists())
+        page.delete()
+        stats.refresh_from_db()
+        self.assertEqual((stats.responses, stats.choice_counts), (0, {}))
+
+    def test_question_statistics_failed_deletion(self):
+        """Ensure a deletion that fails does not leak into later deletions"""
+        self.survey = self._survey()
+        page = self._page()
+        self.field = self._field(page=page, field_type=Field.RADIO_CHOICES)
+        choice = self._fieldchoice()
+        results = []
+        for index in range(3):
+            result = self._surveyresult(survey=self.survey, user=self.make_user("taker{}".format(index)))
+            self._fieldresult(survey=self.survey, page=page, result=result, answer={"answer": str(choice.pk)})
+            results.append(result)
+
+        def refuse(sender, **kwargs):
+            raise ValueError("refused")
+
+        signals.pre_delete.connect(refuse, sender=SurveyResult)
+        try:
+            for delete in [results[0].delete, SurveyResult.objects.filter(pk=results[0].pk).delete]:
+                with self.assertRaises(ValueError):
+                    with transaction.atomic():
+                        delete()
+        finally:
+            signals.pre_delete.disconnect(refuse, sender=SurveyResult)
+        stats = QuestionStatistics.objects.get(question=self.field)
+        self.assertEqual(stats.responses, 3)
+
+        results[1].delete()
+        SurveyResult.objects.filter(pk=results[2].pk).delete()
+        stats.refresh_from_db()
+        self.assertEqual((stats.responses, stats.choice_counts), (1, {str(choice.pk): 1}))
+
+    def test_apply_mapping(self):
+        """Ensure only results with a remapped answer are rewritten"""
+        survey = self._survey()
+        page = self._page(survey=survey)
+        field = self._field(page=page, survey=survey, field_type=Field.MULTIPLE_TEXT, expected_answers=2)
+        answers = [["thing", " thiing"], ["thang", "tang"], ["Thiing", "tang"]]
+        results = [
+            self._fieldresult(
+                survey=survey,
+                page=page,
+                question=field,
+                result=self._surveyresult(survey=survey),
+                answer={"answer": answer}
+            )
+            for answer in answers
+        ]
+
+        with self.settings(FORMLY_REMAP_BATCH_SIZE=1):
+            self.assertEqual(apply_mapping(field, {"THIING": "THING"}), 2)
+        self.assertEqual(
+            [FieldResult.objects.get(pk=result.pk).answer["mapping"] for result in results],
+            [{"THIING": "THING"}, {}, {"THIING": "THING"}]
+        )
+
+        with self.assertNumQueries(7):
+            self.assertEqual(apply_mapping(field, {"THIING": "THING", "TANG": "THANG"}), 2)
+        self.assertEqual(
+            FieldResult.objects.get(pk=results[2].pk).answer["mapping"],
+            {"THIING": "THING", "TANG": "THANG"}
+        )
+        self.assertEqual(apply_mapping(field, {"THIING": "THING", "TANG": "THANG"}), 0)
+        field.refresh_from_db()
+        self.assertEqual(field.mapping, {"THIING": "THING", "TANG": "THANG"})
+
+    def test_apply_mapping_keeps_new_answers(self):
+        """Ensure an answer changed while remapping is not overwritten"""
+        survey = self._survey()
+        page = self._page(survey=survey)
+        field = self._field(page=page, survey=survey, field_type=Field.MULTIPLE_TEXT, expected_answers=1)
+        results = [
+            self._fieldresult(
+                survey=survey,
+                page=page,
+                question=field,
+                result=self._surveyresult(survey=survey),
+                answer={"answer": ["thiing"]}
+            )
+            for _ in range(2)
+        ]
+        flush = remapping._flush
+
+        def answer_then_flush(*args, **kwargs):
+            # the respondent of the second result answers again once the
+            # results to remap have been read
+            FieldResult.objects.filter(pk=results[1].pk).update(answer={"answer": ["other"], "mapping": {}})
+            return flush(*args, **kwargs)
+
+        with self.settings(FORMLY_REMAP_BATCH_SIZE=1):
+            with patch("formly.utils.remapping._flush", side_effect=answer_then_flush):
+                self.assertEqual(apply_mapping(field, {"THIING": "THING"}), 1)
+        self.assertEqual(FieldResult.objects.get(pk=results[0].pk).answer["mapping"], {"THIING": "THING"})
+        self.assertEqual(FieldResult.objects.get(pk=results[1].pk).answer, {"answer": ["other"], "mapping": {}})
+
+    def test_mapping_version_saved_mapping(self):
+        """Ensure saving a changed mapping invalidates its cached lookup"""
+        survey = self._survey()
+        page = self._page(survey=survey)
+        field = self._field(page=page, survey=survey, field_type=Field.MULTIPLE_TEXT, expected_answers=2)
+        field = Field.objects.get(pk=field.pk)
+        # lookups cached by other tests may share the reused primary key
+        with patch.dict(remapping._lookups, clear=True):
+            self.assertEqual(remapping.mapping_lookup(field), {})
+
+            field.label = "relabelled"
+            field.save()
+            self.assertEqual(field.mapping_version, 0)
+
+            field.mapping["thiing"] = "THING"
+            field.save()
+            self.assertEqual(field.mapping_version, 1)
+            self.assertEqual(Field.objects.get(pk=field.pk).mapping_version, 1)
+            self.assertEqual(remapping.mapping_lookup(field), {"THIING": "THING"})
+
+    def test_lazy_mappings(self):
+        """Ensure lazy mappings are resolved when results are read"""
+        survey = self._survey()
+        page = self._page(survey=survey)
+        field = self._field(page=page, survey=survey, field_type=Field.MULTIPLE_TEXT, expected_answers=2)
+        with self.settings(FORMLY_LAZY_MAPPINGS=True):
+            result = self._fieldresult(
+                survey=survey, page=page, question=field, result=self._surveyresult(survey=survey),
+                answer={"answer": ["thiing", "big  thang"]}
+            )
+            with self.assertNumQueries(5):
+                self.assertEqual(apply_mapping(field, {"THIING": "THING", "BIG THANG": "BIG THING"}), 0)
+            self.assertEqual(field.mapping_version, 1)
+
+            result = FieldResult.objects.select_related("question").get(pk=result.pk)
+            self.assertNotIn("mapping", result.answer)
+            with self.assertNumQueries(0):
+                self.assertEqual(result.answer_display(), ["THING", "BIG THING"])
+
+        self.assertEqual(result.answer_display(), ["thiing", "big  thang"])
+
+    def test_normalized_answers(self):
+        """Ensure distinct answer counts follow results as they change"""
+        survey = self._survey()
+        page = self._page(survey=survey)
+        field = self._field(page=page, survey=survey, field_type=Field.MULTIPLE_TEXT, expected_answers=2)
+        field.mapping = {"THIING": "THING"}
+        field.save()
+
+        def counts():
+            NormalizedAnswer.refresh(field)
+            return dict(
+                (answer.text, (answer.count, answer.mapping))
+                for answer in NormalizedAnswer.objects.filter(question=field)
+            )
+
+        first = self._fieldresult(
+            survey=survey, page=page, question=field, result=self._surveyresult(survey=survey),
+            answer={"answer": ["thing ", "  thiing"]}
+        )
+        second = self._fieldresult(
+            survey=survey, page=page, question=field, result=self._surveyresult(survey=survey),
+            answer={"answer": ["Thing", "big  thing"]}
+        )
+        # saving answers only queues the changes on the question's statistics
+        self.assertFalse(NormalizedAnswer.objects.filter(question=field).exists())
+        self.assertEqual(
+            QuestionStatistics.objects.get(question=field).pending_answers,
+            {"THING": 2, "THIING": 1, "BIG THING": 1}
+        )
+        self.assertEqual(counts(), {"THING": (2, ""), "THIING": (1, "THING"), "BIG THING": (1, "")})
+
+        second.answer = {"answer": ["thang", ""]}
+        second.save()
+        self.assertEqual(counts(), {"THING": (1, ""), "THIING": (1, "THING"), "THANG": (1, "")})
+
+        apply_mapping(field, {"THANG": "THING"})
+        self.assertEqual(counts(), {"THING": (1, ""), "THIING": (1, ""), "THANG": (1, "THING")})
+
+        FieldResult.objects.filter(pk=first.pk).delete()
+        self.assertEqual(counts(), {"THANG": (1, "THING")})
+
+        NormalizedAnswer.objects.all().delete()
+        QuestionStatistics.rebuild(field)
+        self.assertEqual(counts(), {"THANG": (1, "THING")})
+
+    def test_similar_answers(self):
+        """Ensure spelling variants are suggested from the persisted index"""
+        survey = self._survey()
+        page = self._page(survey=survey)
+        field = self._field(page=page, survey=survey, field_type=Field.MULTIPLE_TEXT, expected_answers=2)
+
+        def add(*answers):
+            return self._fieldresult(
+                survey=survey, page=page, question=field, result=self._surveyresult(survey=survey),
+                answer={"answer": list(answers)}
+            )
+
+        add("Big Belly Burger", "Star Labs")
+        add("big belty burger", "STAR labs")
+        variant = add("Big Belly Burgers", "Jitters")
+
+        def suggested(text):
+            NormalizedAnswer.refresh(field)
+            return [answer.text for answer in similar_answers(field, text)]
+
+        NormalizedAnswer.refresh(field)
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                [answer.text for answer in similar_answers(field, "big belly burger")],
+                ["BIG BELLY BURGERS", "BIG BELTY BURGER"]
+            )
+        self.assertEqual(suggested("Palmer Technologies"), [])
+
+        FieldResult.objects.filter(pk=variant.pk).delete()
+        self.assertEqual(suggested("big belly burger"), ["BIG BELTY BURGER"])
+        self.assertFalse(NormalizedAnswerBand.objects.filter(answer__text="JITTERS").exists())
+
+        NormalizedAnswer.objects.all().delete()
+        NormalizedAnswer.rebuild(field)
+        self.assertEqual(suggested("big belly burger"), ["BIG BELTY BURGER"])
+
+    def test_page_sequence(self):
+        """Ensure pages can be created, moved and deleted without gaps"""
+        self.survey = self._survey()
+        page1 = self._page()
+        page2 = self._page()
+        sequence = PageSequence(self.survey)
+
+        with self.assertNumQueries(9):
+            new_pages = sequence.create(count=2, position=2, subtitle="new")
+        pages = list(self.survey.pages.all())
+        self.assertEqual(pages, [page1] + new_pages + [page2])
+        self.assertEqual([page.page_num for page in pages], [1, 2, 3, 4])
+        self.assertEqual(pages[1].subtitle, "new")
+
+        sequence.move(page2, 1)
+        self.assertEqual(page2.page_num, 1)
+        self.assertEqual(list(self.survey.pages.all()), [page2, page1] + new_pages)
+
+        page1.delete()
+        pages = list(self.survey.pages.all())
+        self.assertEqual(pages, [page2] + new_pages)
+        self.assertEqual([page.page_num for page in pages], [1, 2, 3])
+        self.assertEqual(self._page().page_num, 4)
+
+    def test_survey_next_page_skips_gaps(self):
+        """Ensure a gap in page numbers does not end the survey early"""
+        self.survey = self._survey()
+        page1 = self._page()
+        self.field = self._field(page=page1)
+        page3 = self._page(page_num=3)
+        result = self._surveyresult(survey=self.survey)
+        self._fieldresult(survey=self.survey, page=page1, result=result, answer={"answer": ""})
+        self.assertEqual(self.survey.next_page(user=self.user), page3)
+
+    def test_survey_publish_versions(self):
+        """Ensure publishing freezes the design into numbered versions"""
+        self.survey = self._survey()
+        page = self._page()
+        self.field = self._field(page=page, label="before")
+
+        version = self.survey.publish()
+        self.assertEqual(version.number, 1)
+        self.assertEqual(version.created, self.survey.published)
+        self.assertEqual(self.survey.published_version, version)
+
+        self.field.label = "after"
+        self.field.save()
+        snapshot = self.survey.snapshot()
+        self.assertEqual([p.pk for p in snapshot.pages], [page.pk])
+        self.assertEqual(snapshot.pages[0].fields[0].label, "before")
+        with self.assertNumQueries(0):
+            self.assertIs(self.survey.snapshot(), snapshot)
+
+        version = self.survey.publish()
+        self.assertEqual(version.number, 2)
+        self.assertEqual(self.survey.snapshot().pages[0].fields[0].label, "after")
+        self.assertEqual(self.survey.versions.count(), 2)
+
+    def test_survey_duplicate(self):
+        """Ensure the whole design tree is copied and targets remapped"""
+        self.survey = self._survey()
+        page1 = self._page(subtitle="first")
+        page2 = self._page()
+        page3 = self._page()
+        page1.target = page3
+        page1.save()
+        self.field = self._field(page=page1, field_type=Field.RADIO_CHOICES, label="pick")
+        target = self._field(page=None, label="why")
+        self._fieldchoice(label="a", target=target)
+        self._fieldchoice(label="b")
+        self._field(page=page2, field_type=Field.RATING_FIELD, scale=self.scale, label="rate")
+
+        with self.assertNumQueries(12):
+            duplicate = self.survey.duplicate()
+
+        self.assertNotEqual(duplicate.pk, self.survey.pk)
+        self.assertEqual(duplicate.name, self.survey.name)
+        pages = list(duplicate.pages.all())
+        self.assertEqual([page.page_num for page in pages], [page1.page_num, page2.page_num, page3.page_num])
+        self.assertEqual(pages[0].subtitle, "first")
+        self.assertEqual(pages[0].target, pages[2])
+        field = duplicate.fields.get(label="pick")
+        self.assertEqual(field.page, pages[0])
+        choices = list(field.choices.order_by("label"))
+        self.assertEqual([choice.label for choice in choices], ["a", "b"])
+        self.assertEqual(choices[0].target, duplicate.fields.get(label="why"))
+        self.assertIsNone(choices[1].target)
+        self.assertEqual(duplicate.fields.get(label="rate").scale, self.scale)
+        self.assertEqual(self.survey.fields.count(), 3)
+
+        self.survey.publish()
+        duplicate = self.survey.duplicate()
+        self.assertIsNone(duplicate.published)
+        self.assertIsNone(duplicate.published_version)
+        self.assertEqual(duplicate.current_page(user=self.user).pk, duplicate.pages.first().pk)
@@ -1,7 +1,21 @@
+import asyncio
+import importlib
 import json
+import threading
+from unittest import skipIf
 
+import django
+from django.core.exceptions import ImproperlyConfigured
+from django.test import override_settings
+from django.urls import resolve, reverse
+
+from mock import patch
+
+from .. import urls
+from ..forms.run import PageForm
 from ..models import Field, FieldChoice, OrdinalScale, Page, Survey
-from .mixins import SimpleTests
+from ..signals import view_phase
+from .mixins import SimpleTests, TransactionTests
 
 
 class ViewTests(SimpleTests):
@@ -216,7 +230,7 @@ class ViewTests(SimpleTests):
             self.assertRedirects(self.last_response, field.get_absolute_url())
             self.assertEqual(field.label, "New Field")
             self.assertEqual(field.field_type, Field.TEXT_FIELD)
-            self.assertEqual(field.ordinal, 1)
+            self.assertEqual(field.ordinal, Field.ORDINAL_GAP)
 
     def test_field_create_not_creator(self):
         """Verify user who didn't create survey is not allowed"""
@@ -307,6 +321,31 @@ class ViewTests(SimpleTests):
         field2.refresh_from_db()
         self.assertTrue(field2.ordinal < field1.ordinal)
 
+    def test_field_reorder(self):
+        """Verify a page's fields can be reordered in one request"""
+        self.survey = self._survey()
+        page = self._page()
+        fields = [self._field(page=page) for _ in range(3)]
+        order = [fields[2].pk, fields[0].pk, fields[1].pk]
+        with self.login(self.user):
+            self.post("formly:ajax_field_reorder", pk=page.pk, data={"fields": order})
+            self.response_200()
+            self.assertIn("html", self.last_response.json())
+        self.assertEqual(list(page.fields.order_by("ordinal").values_list("pk", flat=True)), order)
+
+        with self.login(self.user):
+            self.post("formly:ajax_field_reorder", pk=page.pk, data={"fields": order[:2]})
+            self.response_400()
+
+    def test_field_reorder_not_creator(self):
+        """Verify user who didn't create survey is not allowed"""
+        not_creator = self.make_user("not_creator")
+        self.survey = self._survey()
+        page = self._page()
+        with self.login(not_creator):
+            self.post("formly:ajax_field_reorder", pk=page.pk, data={"fields": []})
+            self.response_403()
+
     def test_field_move_down_not_creator(self):
         """Verify user who didn't create survey is not allowed"""
         not_creator = self.make_user("not_creator")
@@ -349,6 +388,96 @@ class ViewTests(SimpleTests):
             self.get("formly:survey_results", pk=survey.pk)
             self.assertTemplateUsed(template_name="formly/results/home.html")
 
+    @override_settings(FORMLY_RESULTS_PAGE_SIZE=3)
+    def test_survey_results_paginated(self):
+        """Verify results are paged with a keyset cursor and labels resolved in bulk"""
+        self.survey = self._survey()
+        page = self._page()
+        self.field = self._field(page=page, field_type=Field.CHECKBOX_FIELD)
+        choices = [self._fieldchoice() for _ in range(2)]
+        for index in range(5):
+            result = self._surveyresult(survey=self.survey, user=self.make_user("taker{}".format(index)))
+            self._fieldresult(
+                survey=self.survey,
+                page=page,
+                result=result,
+                answer={"answer": [str(choice.pk) for choice in choices]}
+            )
+        with self.login(self.user):
+            self.get("formly:survey_results", pk=self.survey.pk)
+            self.response_200()
+            self.assertEqual(len(self.context["results"]), 3)
+            self.assertEqual(
+                self.context["results"][0].answer_display(),
+                ", ".join(choice.label for choice in choices)
+            )
+            next_cursor = self.context["next_cursor"]
+            with self.assertNumQueries(6):
+                self.get("formly:survey_results", pk=self.survey.pk, data={"after": next_cursor})
+            self.assertEqual(len(self.context["results"]), 2)
+            self.assertIsNone(self.context["next_cursor"])
+
+    def test_survey_results_export(self):
+        """Verify results stream as one row per respondent with choice labels"""
+        self.survey = self._survey()
+        page = self._page()
+        self.field = self._field(page=page, label="Color", field_type=Field.RADIO_CHOICES)
+        choice = self._fieldchoice(label="Blue")
+        text_field = self._field(page=page, label="Name")
+        taker = self.make_user("taker")
+        result = self._surveyresult(survey=self.survey, user=taker)
+        self._fieldresult(survey=self.survey, page=page, result=result, answer={"answer": str(choice.pk)})
+        self._fieldresult(question=text_field, survey=self.survey, page=page, result=result, answer={"answer": "Joe"})
+        self._surveyresult(survey=self.survey, user=self.make_user("idle"))
+
+        with self.login(self.user):
+            self.get("formly:survey_results_export", pk=self.survey.pk, export_format="csv")
+            self.response_200()
+            lines = b"".join(self.last_response.streaming_content).decode("utf-8").splitlines()
+            self.assertEqual(lines[0], "user,date_submitted,color,name")
+            self.assertTrue(lines[1].startswith("taker,"))
+            self.assertTrue(lines[1].endswith(",Blue,Joe"))
+            self.assertTrue(lines[2].endswith(",,"))
+
+            self.get("formly:survey_results_export", pk=self.survey.pk, export_format="ndjson")
+            rows = [
+                json.loads(line)
+                for line in b"".join(self.last_response.streaming_content).decode("utf-8").splitlines()
+            ]
+            self.assertEqual(rows[0]["color"], "Blue")
+            self.assertEqual(rows[1]["user"], "idle")
+
+            self.get("formly:survey_results_export", pk=self.survey.pk, export_format="xml")
+            self.response_404()
+
+    def test_survey_results_export_duplicate_names(self):
+        """Verify questions sharing a name, or named like a fixed column, get their own columns"""
+        self.survey = self._survey()
+        page = self._page()
+        first = self._field(page=page, label="Comments")
+        second = self._field(page=page, label="Comments")
+        user_field = self._field(page=page, label="User")
+        taker = self.make_user("taker")
+        result = self._surveyresult(survey=self.survey, user=taker)
+        self._fieldresult(question=first, survey=self.survey, page=page, result=result, answer={"answer": "one"})
+        self._fieldresult(question=second, survey=self.survey, page=page, result=result, answer={"answer": "two"})
+        self._fieldresult(question=user_field, survey=self.survey, page=page, result=result, answer={"answer": "me"})
+
+        with self.login(self.user):
+            self.get("formly:survey_results_export", pk=self.survey.pk, export_format="ndjson")
+            row = json.loads(b"".join(self.last_response.streaming_content).decode("utf-8"))
+        self.assertEqual(row["user"], "taker")
+        self.assertEqual(row["comments-{}".format(first.pk)], "one")
+        self.assertEqual(row["comments-{}".format(second.pk)], "two")
+        self.assertEqual(row["user-{}".format(user_field.pk)], "me")
+
+    def test_survey_results_export_not_creator(self):
+        """Verify user who didn't create survey is not allowed"""
+        survey = self._survey()
+        with self.login(self.make_user("not_creator")):
+            self.get("formly:survey_results_export", pk=survey.pk, export_format="csv")
+            self.response_403()
+
     def test_remap_answer_get(self):
         survey = self._survey()
         page = self._page(survey=survey)
@@ -399,6 +528,24 @@ class ViewTests(SimpleTests):
             )
             self.response_302()
 
+    def test_remap_answer_post_replaces_mapping(self):
+        """Verify previous mappings onto the answer are dropped and others kept"""
+        survey = self._survey()
+        page = self._page(survey=survey)
+        field = self._field(page=page, survey=survey, field_type=Field.MULTIPLE_TEXT, expected_answers=4)
+        field.mapping = {"THANG": "THING", "TANG": "TONG"}
+        field.save()
+        with self.login(self.user):
+            self.post(
+                "formly:survey_results_remap",
+                pk=field.pk,
+                answer_string="THING",
+                data={"mapping": ["THIING"]},
+            )
+            self.response_302()
+        field.refresh_from_db()
+        self.assertEqual(field.mapping, {"THIING": "THING", "TANG": "TONG"})
+
     def test_remap_answer_post_ajax(self):
         survey = self._survey()
         page = self._page(survey=survey)
@@ -426,6 +573,48 @@ class ViewTests(SimpleTests):
             )
             self.response_200()
 
+    def test_remap_answer_search_and_paginate(self):
+        """Verify distinct answers are listed by frequency, searched and paged"""
+        survey = self._survey()
+        page = self._page(survey=survey)
+        field = self._field(page=page, survey=survey, field_type=Field.MULTIPLE_TEXT, expected_answers=2)
+        for answers in [["thing", "thiing"], ["thing", "tang"], ["thing", "thang"]]:
+            self._fieldresult(
+                survey=survey, page=page, question=field, result=self._surveyresult(survey=survey),
+                answer={"answer": answers}
+            )
+
+        with self.login(self.user):
+            with self.settings(FORMLY_REMAP_PAGE_SIZE=2):
+                self.get("formly:survey_results_remap", pk=field.pk, answer_string="THING")
+                self.response_200()
+                self.assertEqual([str(a) for a in self.context["unmapped_results"]], ["THING", "TANG"])
+                self.assertTrue(self.context["page_obj"].has_next())
+
+                self.get("formly:survey_results_remap", pk=field.pk, answer_string="THING", data={"page": 2})
+                self.assertEqual([str(a) for a in self.context["unmapped_results"]], ["THANG", "THIING"])
+
+            self.get("formly:survey_results_remap", pk=field.pk, answer_string="THING", data={"q": " th", "sort": "text"})
+            self.assertEqual(
+                [str(a) for a in self.context["unmapped_results"]],
+                ["THANG", "THIING", "THING"]
+            )
+
+            self.get("formly:survey_results_remap", pk=field.pk, answer_string="THING", data={"similar": "1"})
+            self.assertEqual([str(a) for a in self.context["unmapped_results"]], ["THIING"])
+
+            # mappings onto the answer made on other pages are kept
+            self.post(
+                "formly:survey_results_remap", pk=field.pk, answer_string="THING",
+                data={"shown": ["THIING"], "mapping": ["THIING"]}
+            )
+            self.post(
+                "formly:survey_results_remap", pk=field.pk, answer_string="THING",
+                data={"shown": ["TANG", "THANG"], "mapping": ["THANG"]}
+            )
+        field.refresh_from_db()
+        self.assertEqual(field.mapping, {"THIING": "THING", "THANG": "THING"})
+
     def test_field_add_choice_not_creator(self):
         """Verify user who didn't create survey is not allowed"""
         not_creator = self.make_user("not_creator")
@@ -731,6 +920,22 @@ class ViewTests(SimpleTests):
             self.post("formly:choice_delete", pk=choice.pk)
             self.response_403()
 
+
+class RunViews(object):
+    """
+    The run view tests, shared by the synchronous and async views
+    """
+
+    def setUp(self):
+        self.user = self.make_user("test_user")
+
+    def test_take_survey_anonymous(self):
+        """Verify anonymous user is redirected to log in"""
+        self.survey = self._survey()
+        self.get("formly:take_survey", pk=self.survey.pk)
+        self.response_302()
+        self.assertIn("?next=", self.last_response["Location"])
+
     def test_take_survey(self):
         self.survey = self._survey()
         page1 = self._page()
@@ -757,3 +962,280 @@ class ViewTests(SimpleTests):
             self.response_302()
             self.assertEqual(field1.results.get().answer, {"answer": "Five"})
             self.assertEqual(field2.results.get().answer, {"answer": "Six"})
+
+    def test_take_survey_instrumentation(self):
+        """Verify each phase of taking a survey is reported to view_phase receivers"""
+        self.survey = self._survey()
+        page1 = self._page()
+        field1 = self._field(page=page1)
+        self._field(page=self._page())
+        events = []
+
+        def receiver(sender, phase, request, duration, queries, **kwargs):
+            events.append((sender, phase, queries))
+            self.assertGreaterEqual(duration, 0)
+
+        survey_taker = self.make_user("survey_taker")
+        view_phase.connect(receiver)
+        try:
+            with self.login(survey_taker):
+                self.post("formly:take_survey", pk=self.survey.pk, data={field1.name: "Five"})
+                self.response_302()
+        finally:
+            view_phase.disconnect(receiver)
+        self.assertEqual(
+            [(sender, phase) for sender, phase, _ in events],
+            [
+                ("take_survey", "next_page"),
+                ("take_survey", "form_build"),
+                ("take_survey", "validation"),
+                ("take_survey", "save"),
+            ]
+        )
+        self.assertGreater(dict((phase, queries) for _, phase, queries in events)["save"], 0)
+
+        # design endpoints report the whole view as one phase
+        del events[:]
+        view_phase.connect(receiver)
+        try:
+            with self.login(self.user):
+                self.post("formly:ajax_field_reorder", pk=page1.pk, data={"fields": [field1.pk]})
+                self.response_200()
+        finally:
+            view_phase.disconnect(receiver)
+        self.assertEqual([(sender, phase) for sender, phase, _ in events], [("field_reorder", "view")])
+        self.assertGreater(events[0][2], 0)
+
+    def test_take_survey_progress_pointer(self):
+        """Verify saving a page advances the respondent's progress pointer"""
+        self.survey = self._survey()
+        page1 = self._page()
+        field1 = self._field(page=page1)
+        page2 = self._page()
+        self._field(page=page2)
+        survey_taker = self.make_user("survey_taker")
+        with self.login(survey_taker):
+            self.post("formly:take_survey", pk=self.survey.pk, data={field1.name: "Five"})
+            result = self.survey.survey_results.get(user=survey_taker)
+            self.assertEqual(result.completed_pages, [page1.pk])
+            self.assertEqual(result.current_page, page2)
+
+            with self.assertNumQueries(1):
+                self.assertEqual(self.survey.current_page(user=survey_taker), page2)
+            self.get("formly:take_survey", pk=self.survey.pk)
+            self.assertEqual(self.context["page"], page2)
+
+    def test_take_survey_published_field_type_changed(self):
+        """Verify answers are recorded as the published question asked them"""
+        self.survey = self._survey()
+        page1 = self._page()
+        field = self._field(page=page1, label="published", field_type=Field.RADIO_CHOICES)
+        choice = self._fieldchoice(field=field)
+        self._field(page=self._page())
+        self.survey.publish()
+
+        field.field_type = Field.TEXT_FIELD
+        field.save()
+        with self.login(self.make_user("survey_taker")):
+            self.post("formly:take_survey", pk=self.survey.pk, data={"published": str(choice.pk)})
+            self.response_302()
+        self.assertEqual(field.results.get().answer, {"answer": str(choice.pk)})
+        self.assertEqual(field.statistics.choice_counts, {str(choice.pk): 1})
+
+    def test_take_survey_published_snapshot(self):
+        """Verify respondents are served the published design"""
+        self.survey = self._survey()
+        page1 = self._page()
+        field1 = self._field(page=page1, label="published")
+        page2 = self._page()
+        self._field(page=page2)
+        self.survey.publish()
+
+        field1.label = "edited"
+        field1.save()
+        self._field(page=page1, label="added later")
+        survey_taker = self.make_user("survey_taker")
+        with self.login(survey_taker):
+            self.get("formly:take_survey", pk=self.survey.pk)
+            self.response_200()
+            self.assertEqual(self.context["page"].pk, page1.pk)
+            self.assertEqual(list(self.context["form"].fields), ["published"])
+
+            self.post("formly:take_survey", pk=self.survey.pk, data={"published": "Five"})
+            self.response_302()
+            self.assertEqual(field1.results.get().answer, {"answer": "Five"})
+            result = self.survey.survey_results.get(user=survey_taker)
+            self.assertEqual(result.current_page_id, page2.pk)
+            with self.assertNumQueries(1):
+                self.assertEqual(self.survey.current_page(user=survey_taker).pk, page2.pk)
+
+    def test_take_survey_published_design_deleted(self):
+        """Verify respondents can finish after published pages and questions are deleted"""
+        self.survey = self._survey()
+        page1 = self._page()
+        kept = self._field(page=page1, label="kept")
+        removed = self._field(page=page1, label="removed")
+        page2 = self._page()
+        self._field(page=page2)
+        page3 = self._page()
+        only = self._field(page=page3, label="only")
+        self.survey.publish()
+
+        page2.delete()
+        removed.delete()
+        only.delete()
+        survey_taker = self.make_user("survey_taker")
+        with self.login(survey_taker):
+            self.get("formly:take_survey", pk=self.survey.pk)
+            self.assertEqual(list(self.context["form"].fields), ["kept", "removed"])
+            self.post("formly:take_survey", pk=self.survey.pk, data={"kept": "Five", "removed": "Six"})
+            self.response_302()
+            self.assertEqual(kept.results.get().answer, {"answer": "Five"})
+            result = self.survey.survey_results.get(user=survey_taker)
+            self.assertEqual(result.current_page_id, page3.pk)
+
+            # a page whose questions were all deleted still advances progress
+            self.get("formly:take_survey", pk=self.survey.pk)
+            self.assertEqual(self.context["page"].pk, page3.pk)
+            self.post("formly:take_survey", pk=self.survey.pk, data={"only": "Seven"})
+            self.response_302()
+            result.refresh_from_db()
+            self.assertIsNone(result.current_page_id)
+            self.assertEqual(result.completed_pages, [page1.pk, page3.pk])
+
+            self.get("formly:take_survey", pk=self.survey.pk)
+            self.response_302()
+
+    def test_take_survey_published_page_deleted_while_answering(self):
+        """Verify answers to a published page deleted after it was served are discarded"""
+        self.survey = self._survey()
+        page1 = self._page()
+        self._field(page=page1, label="first")
+        page2 = self._page()
+        self._field(page=page2)
+        self.survey.publish()
+
+        survey_taker = self.make_user("survey_taker")
+        form = PageForm(page=self.survey.current_page(user=survey_taker), data={"first": "Five"})
+        page1.delete()
+        self.assertTrue(form.is_valid())
+        form.save(user=survey_taker)
+        self.assertFalse(self.survey.results.exists())
+        result = self.survey.survey_results.get(user=survey_taker)
+        self.assertEqual(result.current_page_id, page2.pk)
+
+    def test_take_survey_complete(self):
+        """Verify respondent who answered every page is sent to the completion page"""
+        self.survey = self._survey()
+        page = self._page()
+        field = self._field(page=page)
+        with self.login(self.make_user("survey_taker")):
+            self.get("formly:take_survey", pk=self.survey.pk)
+            self.response_200()
+            self.assertTemplateUsed("formly/run/page.html")
+
+            self.post("formly:take_survey", pk=self.survey.pk, data={field.name: "Five"})
+            self.get("formly:take_survey", pk=self.survey.pk)
+            self.assertRedirects(self.last_response, "/home/", fetch_redirect_response=False)
+
+    def test_take_survey_complete_design_changed(self):
+        """Verify respondent who finished is offered pages added or made reachable later"""
+        self.survey = self._survey()
+        page1 = self._page()
+        field1 = self._field(page=page1)
+        page2 = self._page()
+        field2 = self._field(page=page2)
+        page3 = self._page()
+        field3 = self._field(page=page3)
+        page1.target = page3
+        page1.save()
+        with self.login(self.make_user("survey_taker")):
+            self.post("formly:take_survey", pk=self.survey.pk, data={field1.name: "Five"})
+            self.post("formly:take_survey", pk=self.survey.pk, data={field3.name: "Six"})
+            self.get("formly:take_survey", pk=self.survey.pk)
+            self.assertRedirects(self.last_response, "/home/", fetch_redirect_response=False)
+
+            page1.target = None
+            page1.save()
+            self.get("formly:take_survey", pk=self.survey.pk)
+            self.response_200()
+            self.assertEqual(self.context["page"].pk, page2.pk)
+
+            self.post("formly:take_survey", pk=self.survey.pk, data={field2.name: "Seven"})
+            self.get("formly:take_survey", pk=self.survey.pk)
+            self.assertRedirects(self.last_response, "/home/", fetch_redirect_response=False)
+
+            page4 = self._page()
+            self._field(page=page4)
+            self.survey.publish()
+            self.get("formly:take_survey", pk=self.survey.pk)
+            self.response_200()
+            self.assertEqual(self.context["page"].pk, page4.pk)
+
+    def test_choice_question(self):
+        """Verify the question revealed by a choice is rendered and answered"""
+        self.survey = self._survey()
+        page = self._page()
+        field = self._field(page=page, field_type=Field.RADIO_CHOICES)
+        target = self._field(page=None, label="why")
+        choice = self._fieldchoice(field=field, target=target)
+        survey_taker = self.make_user("survey_taker")
+        with self.login(survey_taker):
+            self.get("formly:choice_question", pk=choice.pk)
+            self.response_200()
+            self.assertIn("html", self.last_response.json())
+
+            self.post("formly:choice_question", pk=choice.pk, data={target.name: "Because"})
+            self.response_200()
+        result = target.results.get()
+        self.assertEqual(result.answer["answer"], "Because")
+        self.assertEqual(result.page, page)
+        self.assertTrue(result.revealed)
+        with self.login(survey_taker):
+            self.get("formly:take_survey", pk=self.survey.pk)
+            self.response_200()
+            self.assertEqual(self.context["page"].pk, page.pk)
+
+
+class RunViewTests(RunViews, SimpleTests):
+    pass
+
+
+@skipIf(django.VERSION < (3, 1), "async views need Django 3.1")
+@override_settings(ROOT_URLCONF="formly.tests.urls_async")
+class AsyncRunViewTests(RunViews, TransactionTests):
+    """
+    The run view tests against the `async def` views in
+    `formly.views.run_async`
+    """
+
+    def test_views_are_async(self):
+        match = resolve(reverse("formly:take_survey", kwargs={"pk": 1}))
+        self.assertTrue(asyncio.iscoroutinefunction(match.func))
+        match = resolve(reverse("formly:choice_question", kwargs={"pk": 1}))
+        self.assertTrue(asyncio.iscoroutinefunction(match.func))
+
+    def test_async_views_need_django_31(self):
+        with override_settings(FORMLY_ASYNC_VIEWS=True), patch("django.VERSION", (2, 2, 28, "final", 0)):
+            with self.assertRaises(ImproperlyConfigured):
+                importlib.reload(urls)
+        importlib.reload(urls)
+
+    def test_complete_redirect_callback_may_query(self):
+        """Verify the completion callback runs on a worker thread, where it may use the ORM"""
+        self.survey = self._survey()
+        field = self._field(page=self._page())
+
+        threads = []
+
+        def callback(survey):
+            threads.append(threading.get_ident())
+            return Survey.objects.get(pk=survey.pk).get_absolute_url()
+
+        with self.login(self.make_user("survey_taker")):
+            self.post("formly:take_survey", pk=self.survey.pk, data={field.name: "Five"})
+            with patch("formly.views.run.COMPLETE_REDIRECT_CALLBACK", callback):
+                self.get("formly:take_survey", pk=self.survey.pk)
+        self.assertRedirects(self.last_response, self.survey.get_absolute_url(), fetch_redirect_response=False)
+        # thread_sensitive=False: not the thread shared by thread-sensitive code
+        self.assertNotEqual(threads, [threading.get_ident()])
@@ -1,10 +1,21 @@
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 from formly.forms.run import PageForm
 
-from ..models import Field, FieldChoice, Page, Survey
+from ..models import (
+    Field,
+    FieldChoice,
+    OrdinalChoice,
+    OrdinalScale,
+    Page,
+    Survey,
+    SurveyResult,
+)
+from ..utils.specs import invalidate_survey_specs
 
 User = get_user_model()
 
@@ -115,3 +126,147 @@ class Tests(TestCase):
         # The form should have all four key values for all four fields
         for c_pk in choice_pks:
             self.assertTrue('value="{}"'.format(c_pk) in form_htm)
+
+    def test_page_form_uses_cached_spec(self):
+        """
+        Ensure a compiled page spec is reused and rebuilt after design edits.
+        """
+        survey = Survey.objects.create(
+            name="spec cache test",
+            creator=self.user,
+        )
+        page = Page.objects.create(survey=survey, page_num=1)
+        field = Field.objects.create(
+            survey=survey,
+            label="radio field",
+            field_type=Field.RADIO_CHOICES,
+            ordinal=0,
+            page=page,
+        )
+        target = Field.objects.create(
+            survey=survey,
+            label="target field",
+            field_type=Field.TEXT_FIELD,
+            ordinal=0,
+        )
+        choice = FieldChoice.objects.create(label="a", field=field, target=target)
+
+        form = PageForm(page=page)
+        self.assertEqual(form.fields[field.name].widget.attrs["data-reveal"], str(choice.pk))
+        self.assertEqual(form.fields[target.name].widget.attrs["data-reveal-id"], choice.pk)
+
+        survey = Survey.objects.get(pk=survey.pk)
+        with self.assertNumQueries(0):
+            PageForm(page=page, survey=survey).as_p()
+
+        FieldChoice.objects.create(label="b", field=field)
+        form = PageForm(page=page)
+        self.assertEqual(len(form.fields[field.name].choices), 2)
+
+    def test_page_spec_design_version(self):
+        """
+        Ensure page specs follow the design version stored on the survey,
+        including scale edits, and that saving a stale survey keeps it.
+        """
+        survey = Survey.objects.create(name="design version test", creator=self.user)
+        page = Page.objects.create(survey=survey, page_num=1)
+        scale = OrdinalScale.objects.create(name="agree", kind=OrdinalScale.ORDINAL_KIND_LIKERT)
+        field = Field.objects.create(
+            survey=survey,
+            label="likert field",
+            field_type=Field.LIKERT_FIELD,
+            ordinal=0,
+            page=page,
+            scale=scale,
+        )
+        choices = [OrdinalChoice.objects.create(scale=scale, label=str(score), score=score) for score in range(3)]
+        self.assertEqual(len(PageForm(page=page).fields[field.name].choices), 3)
+
+        version = Survey.objects.get(pk=survey.pk).design_version
+        choices[0].delete()
+        self.assertEqual(Survey.objects.get(pk=survey.pk).design_version, version + 1)
+        self.assertEqual(len(PageForm(page=page).fields[field.name].choices), 2)
+
+        survey.name = "renamed"
+        survey.save()
+        survey = Survey.objects.get(pk=survey.pk)
+        self.assertEqual((survey.name, survey.design_version), ("renamed", version + 1))
+
+        scale.delete()
+        self.assertEqual(Survey.objects.get(pk=survey.pk).design_version, version + 2)
+
+    def test_page_form_save_query_count(self):
+        """
+        Ensure saving a page costs the same number of queries regardless of
+        how many questions it has, and keeps MULTIPLE_TEXT mappings.
+        """
+        survey = Survey.objects.create(
+            name="bulk save test",
+            creator=self.user,
+        )
+        SurveyResult.objects.create(survey=survey, user=self.user, completed_pages=[])
+
+        def save_page(field_count):
+            page = Page.objects.create(survey=survey)
+            data = {}
+            for index in range(field_count):
+                field = Field.objects.create(
+                    survey=survey,
+                    label="field {} {}".format(page.pk, index),
+                    field_type=Field.MULTIPLE_TEXT,
+                    expected_answers=1,
+                    mapping={"FOO": "BAR"},
+                    ordinal=0,
+                    page=page,
+                )
+                data["{}_0".format(field.name)] = "foo"
+            counts = []
+            for _ in range(2):
+                form = PageForm(data=data, page=page)
+                self.assertTrue(form.is_valid())
+                with CaptureQueriesContext(connection) as queries:
+                    form.save(user=self.user)
+                counts.append(len(queries))
+            self.assertEqual(page.results.count(), field_count)
+            for result in page.results.all():
+                self.assertEqual(result.answer["mapping"], {"FOO": "BAR"})
+            return counts
+
+        self.assertEqual(save_page(2), save_page(6))
+
+    def test_page_form_build_query_count(self):
+        """
+        Ensure compiling a page form costs the same number of queries
+        regardless of how many questions, choices and targets it has.
+        """
+        survey = Survey.objects.create(
+            name="prefetch test",
+            creator=self.user,
+        )
+
+        def build_page(field_count):
+            page = Page.objects.create(survey=survey)
+            for index in range(field_count):
+                field = Field.objects.create(
+                    survey=survey,
+                    label="radio {} {}".format(page.pk, index),
+                    field_type=Field.RADIO_CHOICES,
+                    ordinal=0,
+                    page=page,
+                )
+                target = Field.objects.create(
+                    survey=survey,
+                    label="target {} {}".format(page.pk, index),
+                    field_type=Field.SELECT_FIELD,
+                    ordinal=0,
+                )
+                FieldChoice.objects.create(label="x", field=target)
+                FieldChoice.objects.create(label="a", field=field, target=target)
+                FieldChoice.objects.create(label="b", field=field)
+            invalidate_survey_specs(survey.pk)
+            with CaptureQueriesContext(connection) as queries:
+                form = PageForm(page=page)
+            self.assertEqual(len(form.fields), field_count * 2)
+            return len(queries)
+
+        self.assertEqual(build_page(2), build_page(8))
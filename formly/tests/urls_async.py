@@ -0,0 +1,23 @@
+from django.conf.urls import include, url
+from django.views.generic import TemplateView
+
+from formly import urls
+from formly.views import run_async
+
+# formly.urls with the run views replaced by their async versions, as with
+# FORMLY_ASYNC_VIEWS = True
+ASYNC_VIEWS = {
+    "take_survey": run_async.take_survey,
+    "choice_question": run_async.choice_question,
+}
+
+formly_patterns = [
+    url(pattern.pattern.regex.pattern, ASYNC_VIEWS[pattern.name], name=pattern.name)
+    if pattern.name in ASYNC_VIEWS else pattern
+    for pattern in urls.urlpatterns
+]
+
+urlpatterns = [
+    url(r"^home/", TemplateView.as_view(template_name="no-ie.html"), name="home"),
+    url(r"^", include((formly_patterns, "formly"), namespace="formly")),
+]
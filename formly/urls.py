@@ -1,6 +1,16 @@
+import django
 from django.conf.urls import url
+from django.core.exceptions import ImproperlyConfigured
 
-from formly.views import design, results, run
+from formly.conf import settings
+from formly.views import design, results
+
+if settings.FORMLY_ASYNC_VIEWS:
+    if django.VERSION < (3, 1):
+        raise ImproperlyConfigured("FORMLY_ASYNC_VIEWS requires Django 3.1 or later")
+    from formly.views import run_async as run
+else:
+    from formly.views import run
 
 app_name = "formly"
 
@@ -27,6 +37,7 @@ urlpatterns = [
     url(r"^design/surveys/(?P<pk>\d+)/delete/$", design.SurveyDelete.as_view(), name="survey_delete"),
 
     url(r"^ajax/design/choices/(?P<pk>\d+)/delete/$", design.choice_delete, name="ajax_choice_delete"),
+    url(r"^ajax/design/pages/(?P<pk>\d+)/fields/reorder/$", design.field_reorder, name="ajax_field_reorder"),
     url(r"^ajax/design/fields/(?P<field_pk>\d+)/likert-scales/(?P<scale_pk>\d+)/set/$", design.likert_scale_set, name="ajax_likert_scale_set"),
     url(r"^ajax/design/fields/(?P<field_pk>\d+)/likert-scales/create/$", design.likert_scale_create, name="ajax_likert_scale_create"),
     url(r"^ajax/design/fields/(?P<field_pk>\d+)/rating-scales/(?P<scale_pk>\d+)/set/$", design.rating_scale_set, name="ajax_rating_scale_set"),
@@ -36,5 +47,6 @@ urlpatterns = [
     url(r"^run/ajax/choice-question/(?P<pk>\d+)/$", run.choice_question, name="choice_question"),
 
     url(r"^results/survey/(?P<pk>\d+)/$", results.survey_results, name="survey_results"),
+    url(r"^results/survey/(?P<pk>\d+)/export/(?P<export_format>\w+)/$", results.survey_results_export, name="survey_results_export"),
     url(r"^results/remap/(?P<pk>\d+)/(?P<answer_string>[\w\W]+)/$", results.RemapView.as_view(), name="survey_results_remap"),
 ]
@@ -0,0 +1,247 @@
+from django.db import transaction
+
+from formly.utils.scales import bump_scales
+
+
+def bulk_create_with_pks(objs, queryset, using=None):
+    """
+    `bulk_create` `objs` and make sure each of them has its primary key set.
+
+    Backends that cannot return rows from a bulk insert get the new primary
+    keys read back from `queryset`, which must select exactly the inserted
+    rows; auto-increment keys follow insertion order.
+    """
+    if not objs:
+        return objs
+    model = queryset.model
+    using = using or queryset.db
+    model.objects.db_manager(using).bulk_create(objs)
+    if any(obj.pk is None for obj in objs):
+        pks = list(queryset.using(using).order_by("pk").values_list("pk", flat=True))
+        for obj, pk in zip(objs, pks):
+            obj.pk = pk
+    return objs
+
+
+def _read_design(survey):
+    """
+    Read the design tree of `survey` with one query per table into the
+    index-based `pages` and `fields` of a `survey_document`, each field's
+    `scale` being an index into the returned list of scale pks.
+    """
+    from formly.models import FieldChoice
+
+    pages = list(survey.pages.all())
+    fields = list(survey.fields.order_by("pk"))
+    choices = list(FieldChoice.objects.filter(field__survey=survey).order_by("pk"))
+
+    page_index = dict((page.pk, index) for index, page in enumerate(pages))
+    field_index = dict((field.pk, index) for index, field in enumerate(fields))
+    scale_ids = sorted(set(field.scale_id for field in fields if field.scale_id is not None))
+    scale_index = dict((scale_id, index) for index, scale_id in enumerate(scale_ids))
+
+    field_choices = dict((field.pk, []) for field in fields)
+    for choice in choices:
+        field_choices[choice.field_id].append([choice.label, field_index.get(choice.target_id)])
+
+    page_documents = [
+        {
+            "page_num": page.page_num,
+            "subtitle": page.subtitle,
+            "target": page_index.get(page.target_id),
+        }
+        for page in pages
+    ]
+    field_documents = [
+        {
+            "page": page_index.get(field.page_id),
+            "label": field.label,
+            "field_type": field.field_type,
+            "scale": scale_index.get(field.scale_id),
+            "help_text": field.help_text,
+            "ordinal": field.ordinal,
+            "maximum_choices": field.maximum_choices,
+            "required": field.required,
+            "expected_answers": field.expected_answers,
+            "mapping": field.mapping,
+            "choices": field_choices[field.pk],
+        }
+        for field in fields
+    ]
+    return page_documents, field_documents, scale_ids
+
+
+def _write_design(survey, page_documents, field_documents, scale_ids, using):
+    """
+    Create the pages, fields and choices described by index-based
+    `page_documents` and `field_documents` under the new `survey`, with one
+    bulk insert per table and a single bulk update for the page targets.
+    """
+    from formly.models import Field, FieldChoice, Page
+
+    pages = bulk_create_with_pks(
+        [
+            Page(survey=survey, page_num=page["page_num"], subtitle=page["subtitle"])
+            for page in page_documents
+        ],
+        Page.objects.filter(survey=survey),
+        using=using
+    )
+    fields = bulk_create_with_pks(
+        [
+            Field(
+                survey=survey,
+                page=pages[field["page"]] if field["page"] is not None else None,
+                label=field["label"],
+                field_type=field["field_type"],
+                scale_id=scale_ids[field["scale"]] if field["scale"] is not None else None,
+                help_text=field["help_text"],
+                ordinal=field["ordinal"],
+                maximum_choices=field["maximum_choices"],
+                required=field["required"],
+                expected_answers=field["expected_answers"],
+                mapping=field["mapping"],
+            )
+            for field in field_documents
+        ],
+        Field.objects.filter(survey=survey),
+        using=using
+    )
+    FieldChoice.objects.using(using).bulk_create([
+        FieldChoice(
+            field=field,
+            label=label,
+            target=fields[target] if target is not None else None,
+        )
+        for field, field_document in zip(fields, field_documents)
+        for label, target in field_document["choices"]
+    ])
+
+    targeted = []
+    for page, page_document in zip(pages, page_documents):
+        if page_document["target"] is not None:
+            page.target = pages[page_document["target"]]
+            targeted.append(page)
+    Page.objects.using(using).bulk_update(targeted, ["target"])
+
+
+def duplicate_survey(survey):
+    """
+    Copy `survey` with all of its pages, fields and choices. The copy is a
+    new, unpublished design.
+
+    The design tree is read with one query per table and written with one
+    bulk insert per table; page targets are rewritten with a single bulk
+    update and choice targets are remapped before their insert.
+    """
+    from formly.models import Survey
+
+    using = survey._state.db or "default"
+    with transaction.atomic(using=using):
+        pages, fields, scale_ids = _read_design(survey)
+        duplicate = Survey.objects.db_manager(using).create(
+            name=survey.name,
+            creator_id=survey.creator_id,
+            created=survey.created,
+        )
+        _write_design(duplicate, pages, fields, scale_ids, using)
+
+    return duplicate
+
+
+SURVEY_DOCUMENT_VERSION = 1
+
+
+def survey_document(survey):
+    """
+    Serialize the design tree of `survey` (pages, fields, choices, targets
+    and the ordinal scales it uses) into one JSON-serializable document.
+
+    Pages and fields refer to each other by their index in the document so
+    that it can be loaded into any database.
+    """
+    from formly.models import OrdinalChoice, OrdinalScale
+
+    pages, fields, scale_ids = _read_design(survey)
+    scales = list(OrdinalScale.objects.filter(pk__in=scale_ids).order_by("pk"))
+    scale_choices = list(OrdinalChoice.objects.filter(scale__in=scale_ids).order_by("score"))
+
+    ordinal_choices = dict((scale.pk, []) for scale in scales)
+    for choice in scale_choices:
+        ordinal_choices[choice.scale_id].append([choice.label, choice.score])
+
+    return {
+        "version": SURVEY_DOCUMENT_VERSION,
+        "survey": {
+            "name": survey.name,
+        },
+        "scales": [
+            {
+                "name": scale.name,
+                "kind": scale.kind,
+                "choices": ordinal_choices[scale.pk],
+            }
+            for scale in scales
+        ],
+        "pages": pages,
+        "fields": fields,
+    }
+
+
+def _load_scales(documents, using):
+    """
+    Match the document's scales with identical scales (name, kind and
+    choices) in the target database, creating the ones that are missing.
+    """
+    from formly.models import OrdinalChoice, OrdinalScale
+
+    existing = {}
+    candidates = OrdinalScale.objects.using(using).filter(
+        name__in=[document["name"] for document in documents]
+    ).prefetch_related("choices")
+    for scale in candidates:
+        key = (scale.name, scale.kind, tuple(sorted((c.label, c.score) for c in scale.choices.all())))
+        existing.setdefault(key, scale)
+
+    scales = []
+    missing = []
+    for document in documents:
+        key = (document["name"], document["kind"], tuple(sorted(tuple(c) for c in document["choices"])))
+        scale = existing.get(key)
+        if scale is None:
+            scale = OrdinalScale(name=document["name"], kind=document["kind"])
+            existing[key] = scale
+            missing.append((scale, document))
+        scales.append(scale)
+
+    if missing:
+        # Surveys share a handful of scales, so these are saved one by one
+        for scale, _ in missing:
+            scale.save(using=using)
+        OrdinalChoice.objects.using(using).bulk_create([
+            OrdinalChoice(scale=scale, label=label, score=score)
+            for scale, document in missing
+            for label, score in document["choices"]
+        ])
+        # bulk_create() does not send post_save
+        bump_scales([scale.pk for scale, _ in missing], using)
+    return scales
+
+
+def load_survey_document(document, creator, using="default"):
+    """
+    Create a new survey from a `survey_document` in the `using` database
+    with one bulk insert per table, all inside a single transaction.
+    """
+    from formly.models import Survey
+
+    if document.get("version") != SURVEY_DOCUMENT_VERSION:
+        raise ValueError("Unsupported survey document version: {}".format(document.get("version")))
+
+    with transaction.atomic(using=using):
+        scales = _load_scales(document["scales"], using)
+        survey = Survey(name=document["survey"]["name"], creator=creator)
+        survey.save(using=using)
+        _write_design(survey, document["pages"], document["fields"], [scale.pk for scale in scales], using)
+
+    return survey
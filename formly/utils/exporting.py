@@ -0,0 +1,291 @@
+import csv
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from django.utils.dateparse import parse_date
+
+from formly.utils.remapping import mapped_answers
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+class Echo(object):
+    """
+    File-like object whose `write` hands the value straight back, so
+    `csv.writer` can be used to produce rows one at a time for streaming.
+    """
+
+    def write(self, value):
+        return value
+
+
+def export_fields(survey):
+    """
+    Every question of the survey, in page then ordinal order with questions
+    that are only reachable through a choice target last.
+    """
+    return list(survey.fields.order_by(
+        F("page__page_num").asc(nulls_last=True),
+        "ordinal",
+        "pk"
+    ))
+
+
+RESERVED_COLUMNS = ["user", "date_submitted"]
+
+
+def column_names(fields):
+    """
+    Map the pk of each of `fields` to its export column: the question name,
+    suffixed with the pk when several questions share it or it would shadow
+    one of `RESERVED_COLUMNS`.
+    """
+    counts = {}
+    for field in fields:
+        counts[field.name] = counts.get(field.name, 0) + 1
+    return dict(
+        (
+            field.pk,
+            field.name if counts[field.name] == 1 and field.name not in RESERVED_COLUMNS
+            else "{}-{}".format(field.name, field.pk)
+        )
+        for field in fields
+    )
+
+
+class ChoiceLabels(object):
+    """
+    Preloaded lookup of choice labels for every question of a survey
+    """
+
+    def __init__(self, survey, fields):
+        from formly.models import FieldChoice, OrdinalChoice
+
+        self.choices = dict(
+            FieldChoice.objects.filter(field__survey=survey).values_list("pk", "label")
+        )
+        self.ordinal_choices = dict(
+            (pk, "{} ({})".format(label, score))
+            for pk, label, score in OrdinalChoice.objects.filter(
+                scale__in=set(field.scale_id for field in fields if field.scale_id)
+            ).values_list("pk", "label", "score")
+        )
+
+    def _label(self, lookup, value):
+        try:
+            return lookup.get(int(value), value)
+        except (TypeError, ValueError):
+            return value
+
+    def display(self, field, answer, upload):
+        from formly.models import Field
+
+        if field.field_type == Field.MEDIA_FIELD:
+            return upload or None
+        value = answer.get("answer") if answer else None
+        if value in (None, ""):
+            return value
+        if field.needs_choices:
+            if field.field_type == Field.CHECKBOX_FIELD:
+                return [self._label(self.choices, v) for v in value]
+            return self._label(self.choices, value)
+        if field.field_type in [Field.LIKERT_FIELD, Field.RATING_FIELD]:
+            return self._label(self.ordinal_choices, value)
+        if field.field_type == Field.MULTIPLE_TEXT and isinstance(value, list):
+            return mapped_answers(field, answer)
+        return value
+
+
+class TypedValues(object):
+    """
+    Converts answers to native values: choice pks and ordinal scores as
+    integers, dates as `datetime.date` and multiple answers as lists.
+    """
+
+    def __init__(self, survey, fields):
+        from formly.models import Field, OrdinalChoice
+
+        self.scores = dict(
+            OrdinalChoice.objects.filter(
+                scale__in=set(field.scale_id for field in fields if field.scale_id)
+            ).values_list("pk", "score")
+        )
+        self.converters = {
+            Field.CHECKBOX_FIELD: self._choices,
+            Field.MULTIPLE_TEXT: self._texts,
+            Field.RADIO_CHOICES: self._int,
+            Field.SELECT_FIELD: self._int,
+            Field.LIKERT_FIELD: self._score,
+            Field.RATING_FIELD: self._score,
+            Field.DATE_FIELD: self._date,
+        }
+
+    def _int(self, value):
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+
+    def _choices(self, value):
+        return [self._int(v) for v in (value if isinstance(value, list) else [value])]
+
+    def _texts(self, value):
+        return [str(v) for v in (value if isinstance(value, list) else [value])]
+
+    def _score(self, value):
+        return self.scores.get(self._int(value))
+
+    def _date(self, value):
+        try:
+            return parse_date(value)
+        except (TypeError, ValueError):
+            return None
+
+    def display(self, field, answer, upload):
+        from formly.models import Field
+
+        if field.field_type == Field.MEDIA_FIELD:
+            return upload or None
+        value = answer.get("answer") if answer else None
+        if field.field_type == Field.BOOLEAN_FIELD:
+            return None if value is None else bool(value)
+        if value in (None, ""):
+            return None
+        return self.converters.get(field.field_type, str)(value)
+
+
+def iter_result_rows(survey, chunk_size=2000, values_class=ChoiceLabels):
+    """
+    Yield one dict per `SurveyResult` with the respondent, submission date
+    and one key per question column (see `column_names`). Both tables are read with server-side
+    cursors and merged on the result pk, so memory use does not grow with
+    the number of respondents.
+    """
+    from formly.models import FieldResult
+
+    fields = export_fields(survey)
+    fields_by_pk = dict((field.pk, field) for field in fields)
+    columns = column_names(fields)
+    values = values_class(survey, fields)
+
+    username = "user__{}".format(get_user_model().USERNAME_FIELD)
+    survey_results = survey.survey_results.order_by("pk").values_list(
+        "pk", username, "date_submitted"
+    ).iterator(chunk_size=chunk_size)
+    field_results = FieldResult.objects.filter(survey=survey).order_by("result", "pk").values_list(
+        "result_id", "question_id", "answer", "upload"
+    ).iterator(chunk_size=chunk_size)
+
+    pending = next(field_results, None)
+    for result_pk, user, date_submitted in survey_results:
+        row = dict((column, None) for column in columns.values())
+        row["user"] = user
+        row["date_submitted"] = date_submitted
+        while pending is not None and pending[0] <= result_pk:
+            _, question_pk, answer, upload = pending
+            field = fields_by_pk.get(question_pk)
+            if pending[0] == result_pk and field is not None:
+                row[columns[field.pk]] = values.display(field, answer, upload)
+            pending = next(field_results, None)
+        yield row
+
+
+def export_columns(survey):
+    fields = export_fields(survey)
+    columns = column_names(fields)
+    return RESERVED_COLUMNS + [columns[field.pk] for field in fields]
+
+
+def _csv_value(value):
+    if isinstance(value, (list, tuple)):
+        return ", ".join(str(v) for v in value)
+    return value
+
+
+def iter_csv(survey, chunk_size=2000):
+    writer = csv.writer(Echo())
+    columns = export_columns(survey)
+    yield writer.writerow(columns)
+    for row in iter_result_rows(survey, chunk_size=chunk_size):
+        yield writer.writerow([_csv_value(row[column]) for column in columns])
+
+
+def iter_ndjson(survey, chunk_size=2000):
+    for row in iter_result_rows(survey, chunk_size=chunk_size):
+        yield json.dumps(row, cls=DjangoJSONEncoder) + "\n"
+
+
+def iter_export(survey, export_format, chunk_size=2000):
+    if export_format == "csv":
+        return iter_csv(survey, chunk_size=chunk_size)
+    if export_format == "ndjson":
+        return iter_ndjson(survey, chunk_size=chunk_size)
+    raise ValueError("Unsupported export format: {}".format(export_format))
+
+
+def _arrow_type(field):
+    from formly.models import Field
+
+    return {
+        Field.RADIO_CHOICES: pyarrow.int64(),
+        Field.SELECT_FIELD: pyarrow.int64(),
+        Field.LIKERT_FIELD: pyarrow.int64(),
+        Field.RATING_FIELD: pyarrow.int64(),
+        Field.CHECKBOX_FIELD: pyarrow.list_(pyarrow.int64()),
+        Field.MULTIPLE_TEXT: pyarrow.list_(pyarrow.string()),
+        Field.BOOLEAN_FIELD: pyarrow.bool_(),
+        Field.DATE_FIELD: pyarrow.date32(),
+    }.get(field.field_type, pyarrow.string())
+
+
+def arrow_schema(survey):
+    if pyarrow is None:
+        raise ImproperlyConfigured("Parquet export requires pyarrow (pip install formly[parquet])")
+    fields = export_fields(survey)
+    columns = column_names(fields)
+    return pyarrow.schema(
+        [
+            ("user", pyarrow.string()),
+            ("date_submitted", pyarrow.timestamp("us", tz="UTC")),
+        ] + [
+            (columns[field.pk], _arrow_type(field)) for field in fields
+        ]
+    )
+
+
+def iter_record_batches(survey, batch_size=10000):
+    """
+    Yield `pyarrow.RecordBatch` objects of at most `batch_size` respondents
+    """
+    schema = arrow_schema(survey)
+    batch = []
+    for row in iter_result_rows(survey, chunk_size=batch_size, values_class=TypedValues):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield pyarrow.RecordBatch.from_pylist(batch, schema=schema)
+            batch = []
+    if batch:
+        yield pyarrow.RecordBatch.from_pylist(batch, schema=schema)
+
+
+def write_parquet(survey, where, batch_size=10000):
+    """
+    Write the survey's results to `where` (a path or binary file object) as
+    Parquet, one record batch at a time.
+    """
+    schema = arrow_schema(survey)
+    with pyarrow.parquet.ParquetWriter(where, schema) as writer:
+        for batch in iter_record_batches(survey, batch_size=batch_size):
+            writer.write_batch(batch)
@@ -0,0 +1,50 @@
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from django.db import connections
+
+from formly.signals import view_phase
+
+
+class QueryCounter(object):
+    """
+    A database execute wrapper counting the queries run through it
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+@contextmanager
+def phase(view, name, request=None, using="default"):
+    """
+    Time the block and count its queries on the `using` database, then send
+    `formly.signals.view_phase`. Nothing is measured while the signal has no
+    receivers.
+    """
+    if not view_phase.has_listeners():
+        yield
+        return
+
+    counter = QueryCounter()
+    with connections[using].execute_wrapper(counter):
+        start = time.perf_counter()
+        yield
+        duration = time.perf_counter() - start
+    view_phase.send(sender=view, phase=name, request=request, duration=duration, queries=counter.count)
+
+
+def instrumented(view_func):
+    """
+    Report the whole of `view_func` as its "view" phase
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        with phase(view_func.__name__, "view", request):
+            return view_func(request, *args, **kwargs)
+    return wrapper
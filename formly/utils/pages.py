@@ -0,0 +1,114 @@
+from django.db import transaction
+from django.db.models import F
+
+from formly.utils.cloning import bulk_create_with_pks
+
+
+class PageSequence(object):
+    """
+    Keeps the `page_num` of a survey's pages contiguous from 1.
+
+    Every operation locks the survey row first so concurrent edits of the
+    same survey are serialized, then rewrites the page numbers that change
+    with one bulk update.
+    """
+
+    def __init__(self, survey):
+        self.survey = survey
+        self.using = survey._state.db or "default"
+
+    def _lock(self):
+        from formly.models import Survey
+
+        list(Survey.objects.using(self.using).select_for_update().filter(pk=self.survey.pk).values_list("pk"))
+
+    def _pages(self):
+        self._lock()
+        return list(self.survey.pages.using(self.using).order_by("page_num", "pk"))
+
+    def next_page_num(self):
+        """
+        The `page_num` for a page appended to the survey. Must be called in
+        a transaction, which keeps the survey locked until it ends.
+        """
+        self._lock()
+        last = self.survey.pages.using(self.using).order_by("-page_num").values_list("page_num", flat=True).first()
+        return (last or 0) + 1
+
+    def _apply(self, pages, ordered):
+        """
+        Number `ordered` from 1, rewriting the changed rows of `pages` (the
+        survey's current pages) in two steps so that no intermediate state
+        breaks the unique `(survey, page_num)` constraint.
+        """
+        from formly.models import Page
+
+        offset = max([len(ordered)] + [page.page_num or 0 for page in pages]) + 1
+        changed = []
+        for page_num, page in enumerate(ordered, 1):
+            if page.page_num != page_num:
+                page.page_num = page_num
+                if page.pk is not None:
+                    changed.append(page)
+        if changed:
+            Page.objects.using(self.using).filter(pk__in=[page.pk for page in changed]).update(
+                page_num=F("page_num") + offset
+            )
+            Page.objects.using(self.using).bulk_update(changed, ["page_num"])
+        return ordered
+
+    def create(self, count=1, position=None, **kwargs):
+        """
+        Create `count` pages (with `kwargs` as their attributes) at
+        `position`, the 1-based page number of the first new page, or at
+        the end of the survey. Returns the new pages.
+        """
+        from formly.models import Page
+
+        with transaction.atomic(using=self.using):
+            pages = self._pages()
+            if position is None or position > len(pages):
+                position = len(pages) + 1
+            position = max(position, 1)
+
+            new_pages = [Page(survey=self.survey, **kwargs) for _ in range(count)]
+            ordered = pages[:position - 1] + new_pages + pages[position - 1:]
+            self._apply(pages, ordered)
+            bulk_create_with_pks(
+                new_pages,
+                Page.objects.filter(survey=self.survey, page_num__gte=position, page_num__lt=position + count),
+                using=self.using
+            )
+            self._invalidate()
+        return new_pages
+
+    def move(self, page, position):
+        """
+        Move `page` to the 1-based `position`, shifting the pages between
+        its old and new place.
+        """
+        with transaction.atomic(using=self.using):
+            pages = self._pages()
+            ordered = [p for p in pages if p.pk != page.pk]
+            position = min(max(position, 1), len(ordered) + 1)
+            moved = next(p for p in pages if p.pk == page.pk)
+            ordered.insert(position - 1, moved)
+            self._apply(pages, ordered)
+            self._invalidate()
+        page.page_num = moved.page_num
+        return ordered
+
+    def renumber(self):
+        """
+        Close the gaps left in `page_num` by deleted pages
+        """
+        with transaction.atomic(using=self.using):
+            pages = self._pages()
+            self._apply(pages, list(pages))
+            self._invalidate()
+        return pages
+
+    def _invalidate(self):
+        from formly.utils.specs import invalidate_survey_specs
+
+        invalidate_survey_specs(self.survey.pk, self.using)
@@ -0,0 +1,72 @@
+from formly.utils.specs import get_page_pks
+
+
+class SurveyProgress(object):
+    """
+    Resolves where a respondent is in a survey by loading the page graph
+    and the pages the user has answered once, then walking it in memory.
+
+    Published surveys are walked using the pages of their snapshot that
+    still exist; pages deleted since publishing are skipped.
+    """
+
+    def __init__(self, survey, user, completed=None):
+        from formly.models import FieldResult
+
+        self.survey = survey
+        self.snapshot = survey.snapshot()
+        if self.snapshot is not None:
+            live = get_page_pks(survey)
+            self.pages = [page for page in self.snapshot.pages if page.pk in live]
+        else:
+            self.pages = list(survey.pages.all())
+        self.pages_by_pk = dict((page.pk, page) for page in self.pages)
+        self.positions = dict((page.pk, index) for index, page in enumerate(self.pages))
+        if completed is None:
+            completed = FieldResult.objects.page_answers().filter(
+                survey=survey,
+                result__user=user
+            ).values_list("page", flat=True).distinct()
+        self.completed = set(completed)
+
+    def first_page(self):
+        if not self.pages:
+            if self.snapshot is not None:
+                return None
+            page = self.survey.pages.create()
+            self.pages = [page]
+            self.pages_by_pk[page.pk] = page
+            self.positions[page.pk] = 0
+        return self.pages[0]
+
+    def is_completed(self, page):
+        return page.pk in self.completed
+
+    def following_page(self, page):
+        """
+        The page a respondent is sent to once `page` is completed
+        """
+        if page.target_id in self.pages_by_pk:
+            return self.pages_by_pk[page.target_id]
+        index = self.positions.get(page.pk)
+        if index is None or index + 1 >= len(self.pages):
+            return None
+        return self.pages[index + 1]
+
+    def next_page(self, start=None):
+        """
+        Return the first page reachable from `start` (the first page by
+        default) that the user has not completed, or `None` when they are done.
+        """
+        page = start if start is not None else self.first_page()
+        if page is None:
+            return None
+        visited = set()
+        while self.is_completed(page):
+            if page.pk in visited:
+                return None
+            visited.add(page.pk)
+            page = self.following_page(page)
+            if page is None:
+                return None
+        return page
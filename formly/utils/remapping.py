@@ -1,4 +1,16 @@
-def _normalize_answer(answer):
+import threading
+from collections import OrderedDict
+
+from django.db import transaction
+from django.db.models import F
+
+from formly.conf import settings
+
+_lookups = OrderedDict()
+_lookups_lock = threading.Lock()
+
+
+def normalize_answer(answer):
     answer = answer.strip().upper()
     return " ".join([a for a in answer.split(" ") if a])
 
@@ -11,9 +23,169 @@ def create_answer_list(fieldresults):
         answers = result.answer["answer"]
 
         for answer in answers:
-            normalized_answer = _normalize_answer(answer)
+            normalized_answer = normalize_answer(answer)
             if normalized_answer:
                 answer_set.add(normalized_answer)
 
     # Quickly remove duplicates
     return list(answer_set)
+
+
+def answer_mapping(answers, mapping):
+    """
+    The `answer["mapping"]` of a multiple text result with `answers` under
+    the question `mapping`
+    """
+    result = dict()
+    for answer in answers:
+        key = normalize_answer(answer)
+        if key in mapping:
+            result[key] = mapping[key]
+    return result
+
+
+def mapping_lookup(question):
+    """
+    The normalized answer -> canonical answer lookup of `question`, shared
+    by the process for each `mapping_version` of the question.
+    """
+    key = (question._state.db or "default", question.pk, question.mapping_version)
+    with _lookups_lock:
+        lookup = _lookups.get(key)
+        if lookup is not None:
+            _lookups.move_to_end(key)
+            return lookup
+
+    lookup = dict(
+        (normalize_answer(original), mapped)
+        for original, mapped in (question.mapping or dict()).items()
+    )
+    with _lookups_lock:
+        _lookups[key] = lookup
+        while len(_lookups) > settings.FORMLY_MAPPING_CACHE_SIZE:
+            _lookups.popitem(last=False)
+    return lookup
+
+
+def result_mapping(question, answer):
+    """
+    The mapping of the answers in a result's `answer` JSON: resolved from
+    the question's current mapping with `FORMLY_LAZY_MAPPINGS`, otherwise
+    the copy written into the result when it was saved.
+    """
+    if settings.FORMLY_LAZY_MAPPINGS:
+        return answer_mapping((answer or dict()).get("answer") or [], mapping_lookup(question))
+    return (answer or dict()).get("mapping") or dict()
+
+
+def mapped_answers(question, answer):
+    """
+    The answers in a result's `answer` JSON with remapped answers replaced
+    by the answer they are mapped to
+    """
+    answers = (answer or dict()).get("answer") or []
+    mapping = result_mapping(question, answer)
+    return [mapping.get(normalize_answer(value), value) for value in answers]
+
+
+def apply_mapping(question, mapping):
+    """
+    Replace `question.mapping` with `mapping` and rewrite `answer["mapping"]`
+    on the results with an answer whose mapping changed, using chunked bulk
+    updates in one transaction. Returns the number of results rewritten,
+    which is always 0 with `FORMLY_LAZY_MAPPINGS` since results are then
+    mapped when they are read.
+    """
+    from formly.models import Field
+
+    previous = question.mapping or dict()
+    changed = set(
+        key for key in set(previous) | set(mapping)
+        if previous.get(key) != mapping.get(key)
+    )
+    question.mapping = mapping
+
+    with transaction.atomic():
+        # the mapping is not part of the page specs, so skip `Field.save()`
+        Field.objects.filter(pk=question.pk).update(
+            mapping=mapping,
+            mapping_version=F("mapping_version") + 1
+        )
+        question.mapping_version += 1
+        if question.field_type != Field.MULTIPLE_TEXT or not changed:
+            return 0
+
+        targets = dict()
+        for key in changed:
+            targets.setdefault(mapping.get(key, ""), []).append(key)
+        for target, keys in targets.items():
+            question.normalized_answers.filter(text__in=keys).update(mapping=target)
+
+        if settings.FORMLY_LAZY_MAPPINGS:
+            return 0
+        return _rewrite_results(question, changed)
+
+
+def materialize_mapping(question):
+    """
+    Write the current mapping of `question` into `answer["mapping"]` of
+    every result where it is out of date, such as results saved or remapped
+    with `FORMLY_LAZY_MAPPINGS`. Returns the number of results rewritten.
+    """
+    from formly.models import Field
+
+    if question.field_type != Field.MULTIPLE_TEXT:
+        return 0
+    with transaction.atomic():
+        return _rewrite_results(question)
+
+
+def _remapped_answer(question, answer, changed=None):
+    """
+    The `answer` JSON of a result with `answer["mapping"]` recomputed, or
+    `None` when it holds no answer in `changed` (if given) or is up to date
+    """
+    answers = (answer or dict()).get("answer") or []
+    if changed is not None and not changed.intersection(normalize_answer(a) for a in answers):
+        return None
+    mapping = answer_mapping(answers, question.mapping)
+    if answer is None or answer.get("mapping") == mapping:
+        return None
+    answer["mapping"] = mapping
+    return answer
+
+
+def _rewrite_results(question, changed=None):
+    """
+    Recompute `answer["mapping"]` for the results of `question`, limited to
+    those with an answer in `changed` when given, and bulk update the ones
+    that differ. Every result of the question is read once, without locks,
+    to find those; each batch is then locked and read again before it is
+    written, so answers changed in the meantime are not overwritten.
+    """
+    touched = 0
+    batch = []
+    for pk, answer in question.results.order_by().values_list("pk", "answer").iterator():
+        if _remapped_answer(question, answer, changed) is None:
+            continue
+        batch.append(pk)
+        if len(batch) >= settings.FORMLY_REMAP_BATCH_SIZE:
+            touched += _flush(question, batch, changed)
+            batch = []
+    touched += _flush(question, batch, changed)
+    return touched
+
+
+def _flush(question, pks, changed=None):
+    from formly.models import FieldResult
+
+    if not pks:
+        return 0
+    results = []
+    locked = FieldResult.objects.select_for_update().filter(pk__in=pks).order_by("pk")
+    for pk, answer in locked.values_list("pk", "answer"):
+        answer = _remapped_answer(question, answer, changed)
+        if answer is not None:
+            results.append(FieldResult(pk=pk, answer=answer))
+    FieldResult.objects.bulk_update(results, ["answer"])
+    return len(results)
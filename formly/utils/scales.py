@@ -0,0 +1,134 @@
+import threading
+import time
+from collections import namedtuple
+
+from django.db.models import Count, F, Max, Sum
+
+from formly.conf import settings
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+class ScaleChoice(namedtuple("ScaleChoice", ["pk", "scale_id", "label", "score"])):
+    __slots__ = ()
+
+    def __str__(self):
+        return "{} ({})".format(self.label, self.score)
+
+
+class Scale(namedtuple("Scale", ["pk", "name", "kind", "choices"])):
+    """
+    An `OrdinalScale` with its `ScaleChoice` tuple ordered by score
+    """
+    __slots__ = ()
+
+    def __str__(self):
+        return "{} [{}]".format(self.name, ", ".join([str(c) for c in self.choices]))
+
+
+class ScaleRegistry(object):
+    """
+    Every `OrdinalScale` and `OrdinalChoice` of a database, loaded with two
+    queries and shared by the whole process until the scales change.
+    """
+
+    def __init__(self, using, version):
+        from formly.models import OrdinalChoice, OrdinalScale
+
+        self.using = using
+        self.version = version
+        self.checked = time.monotonic()
+        by_scale = {}
+        self.choices = {}
+        for pk, scale_pk, label, score in OrdinalChoice.objects.using(using).order_by(
+            "scale", "score"
+        ).values_list("pk", "scale", "label", "score"):
+            choice = ScaleChoice(pk, scale_pk, label, score)
+            by_scale.setdefault(scale_pk, []).append(choice)
+            self.choices[pk] = choice
+        self.scales = dict(
+            (pk, Scale(pk, name, kind, tuple(by_scale.get(pk, ()))))
+            for pk, name, kind in OrdinalScale.objects.using(using).order_by("pk").values_list(
+                "pk", "name", "kind"
+            )
+        )
+
+    def scale(self, pk):
+        return self.scales.get(pk)
+
+    def scale_choices(self, pk):
+        """
+        The choices of the scale with `pk`, ordered by score
+        """
+        scale = self.scales.get(pk)
+        return scale.choices if scale is not None else ()
+
+    def choice(self, pk):
+        return self.choices.get(pk)
+
+    def score(self, choice_pk):
+        choice = self.choices.get(choice_pk)
+        return choice.score if choice is not None else None
+
+    def by_kind(self, kind):
+        return [scale for scale in self.scales.values() if scale.kind == kind]
+
+
+def scales_version(using="default"):
+    """
+    A fingerprint of the scales stored in the `using` database that changes
+    whenever a scale is created, deleted or bumped by `bump_scales`
+    """
+    from formly.models import OrdinalScale
+
+    aggregates = OrdinalScale.objects.using(using).aggregate(
+        count=Count("pk"),
+        last=Max("pk"),
+        version=Sum("version")
+    )
+    return (aggregates["count"], aggregates["last"], aggregates["version"])
+
+
+def scale_registry(using="default", max_age=None):
+    """
+    Return the `ScaleRegistry` for the `using` database. Changes made by
+    this process drop it right away; changes made by other processes are
+    picked up once it is older than `max_age` seconds, which defaults to
+    `FORMLY_SCALE_REGISTRY_TIMEOUT`, and compares its version to the
+    database.
+    """
+    if max_age is None:
+        max_age = settings.FORMLY_SCALE_REGISTRY_TIMEOUT
+
+    registry = _registries.get(using)
+    if registry is not None and time.monotonic() - registry.checked < max_age:
+        return registry
+
+    version = scales_version(using)
+    if registry is None or registry.version != version:
+        registry = ScaleRegistry(using, version)
+        with _registries_lock:
+            _registries[using] = registry
+    else:
+        registry.checked = time.monotonic()
+    return registry
+
+
+def invalidate_scales(using="default"):
+    """
+    Drop this process's registry for the `using` database
+    """
+    with _registries_lock:
+        _registries.pop(using, None)
+
+
+def bump_scales(scale_pks, using="default"):
+    """
+    Increment the version of the scales with `scale_pks` so every process
+    reloads its registry, for changes that do not send model signals
+    """
+    from formly.models import OrdinalScale
+
+    OrdinalScale.objects.using(using).filter(pk__in=scale_pks).update(version=F("version") + 1)
+    invalidate_scales(using)
@@ -0,0 +1,89 @@
+"""
+Candidate groups of similar free-text answers for remapping.
+
+Every `NormalizedAnswer` stores a MinHash signature of its character
+trigrams. The signature is split into bands and each band is stored as a
+`NormalizedAnswerBand` key, so answers sharing a band with the answer being
+remapped are found with one indexed query (locality-sensitive hashing). The
+candidates are then ranked by their estimated Jaccard similarity.
+"""
+import random
+import zlib
+
+from formly.utils.remapping import normalize_answer
+
+SHINGLE_SIZE = 3
+PERMUTATIONS = 32
+BANDS = 16
+SIMILARITY_THRESHOLD = 0.4
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(PERMUTATIONS)
+_COEFFICIENTS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(PERMUTATIONS)]
+
+
+def shingles(text):
+    """
+    The character trigrams of `text`, padded so that short answers and the
+    start and end of words still count
+    """
+    text = " {} ".format(text)
+    return set(text[i:i + SHINGLE_SIZE] for i in range(max(len(text) - SHINGLE_SIZE + 1, 1)))
+
+
+def minhash(text):
+    """
+    The MinHash signature of the trigrams of `text`, as a list of
+    `PERMUTATIONS` integers
+    """
+    hashes = [zlib.crc32(shingle.encode("utf-8")) for shingle in shingles(text)]
+    return [
+        min((a * value + b) % _PRIME for value in hashes) & 0xffffffff
+        for a, b in _COEFFICIENTS
+    ]
+
+
+def band_keys(signature):
+    """
+    One key per band of `PERMUTATIONS // BANDS` signature values
+    """
+    rows = PERMUTATIONS // BANDS
+    return [
+        "{}:{:08x}".format(band, zlib.crc32(",".join(
+            str(value) for value in signature[band * rows:(band + 1) * rows]
+        ).encode("ascii")))
+        for band in range(BANDS)
+    ]
+
+
+def estimate_similarity(signature, other):
+    """
+    The Jaccard similarity of two answers estimated from their signatures
+    """
+    if not signature or len(signature) != len(other):
+        return 0.0
+    return sum(1 for a, b in zip(signature, other) if a == b) / float(len(signature))
+
+
+def similar_answers(question, text, answers=None, threshold=SIMILARITY_THRESHOLD):
+    """
+    The `NormalizedAnswer` rows of `question` (or of the `answers` queryset)
+    that look like spelling variants of `text`, most similar first, each
+    with a `similarity` attribute
+    """
+    if answers is None:
+        answers = question.normalized_answers.all()
+    text = normalize_answer(text)
+    signature = minhash(text)
+    candidates = answers.filter(
+        bands__question=question,
+        bands__key__in=band_keys(signature)
+    ).exclude(text=text).distinct()
+
+    ranked = []
+    for answer in candidates:
+        answer.similarity = estimate_similarity(signature, answer.signature)
+        if answer.similarity >= threshold:
+            ranked.append(answer)
+    ranked.sort(key=lambda answer: (-answer.similarity, -answer.count, answer.text))
+    return ranked
@@ -0,0 +1,81 @@
+import threading
+from collections import OrderedDict
+
+from formly.conf import settings
+from formly.utils.scales import scale_registry
+from formly.utils.specs import PageSpec, build_page_spec
+
+SNAPSHOT_FORMAT = 1
+
+_snapshots = OrderedDict()
+_snapshots_lock = threading.Lock()
+
+
+def build_snapshot(survey):
+    """
+    Compile every page of `survey` into a JSON-serializable document that
+    can be run without reading the design tables.
+    """
+    scale_registry(survey._state.db or "default", max_age=0)
+    fields = {}
+    for field in survey.fields.filter(page__isnull=False).order_by("ordinal", "pk").with_choices():
+        fields.setdefault(field.page_id, []).append(field)
+    return {
+        "format": SNAPSHOT_FORMAT,
+        "pages": [
+            build_page_spec(page, fields=fields.get(page.pk, [])).to_dict()
+            for page in survey.pages.all()
+        ],
+    }
+
+
+class SurveySnapshot(object):
+    """
+    The pages of a published `SurveyVersion`, as `PageSpec` objects, with
+    lookups for the page graph and choice targets.
+    """
+
+    def __init__(self, version_pk, document):
+        self.version_pk = version_pk
+        self.pages = [PageSpec.from_dict(page) for page in document["pages"]]
+        self.pages_by_pk = dict((page.pk, page) for page in self.pages)
+        self.targets = {}
+        for page in self.pages:
+            for field in page.fields:
+                for choice_pk, target in field.targets:
+                    self.targets[choice_pk] = target
+
+    def page(self, pk):
+        return self.pages_by_pk.get(pk)
+
+    def target(self, choice_pk):
+        """
+        The `FieldSpec` revealed by the `FieldChoice` with `choice_pk`
+        """
+        return self.targets.get(choice_pk)
+
+
+def get_snapshot(version_pk, created, using="default"):
+    """
+    Return the `SurveySnapshot` of a `SurveyVersion` from a process-wide LRU
+    cache. Versions never change once written, so entries are only evicted
+    to honour `FORMLY_SNAPSHOT_CACHE_SIZE`; the key includes the version's
+    `created` time so that a reused primary key cannot serve a stale entry.
+    """
+    from formly.models import SurveyVersion
+
+    key = (using, version_pk, created)
+    with _snapshots_lock:
+        snapshot = _snapshots.get(key)
+        if snapshot is not None:
+            _snapshots.move_to_end(key)
+            return snapshot
+
+    document = SurveyVersion.objects.using(using).values_list("snapshot", flat=True).get(pk=version_pk)
+    snapshot = SurveySnapshot(version_pk, document)
+
+    with _snapshots_lock:
+        _snapshots[key] = snapshot
+        while len(_snapshots) > settings.FORMLY_SNAPSHOT_CACHE_SIZE:
+            _snapshots.popitem(last=False)
+    return snapshot
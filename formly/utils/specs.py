@@ -0,0 +1,266 @@
+from collections import namedtuple
+
+from django.core.cache import caches
+from django.db.models import F
+
+from formly.conf import settings
+
+_local_specs = {}
+
+
+class FieldSpec(namedtuple("FieldSpec", [
+    "pk",
+    "name",
+    "label",
+    "help_text",
+    "field_type",
+    "required",
+    "maximum_choices",
+    "expected_answers",
+    "choices",
+    "targets",
+])):
+    """
+    Immutable, picklable description of a `Field` and everything needed to
+    build its form field without touching the database.
+
+    `choices` is a tuple of `(pk, label)` pairs and `targets` is a tuple of
+    `(choice_pk, FieldSpec)` pairs for choices that reveal another question.
+    """
+    __slots__ = ()
+
+    @property
+    def needs_choices(self):
+        from formly.models import Field
+        return self.field_type in [
+            Field.RADIO_CHOICES,
+            Field.SELECT_FIELD,
+            Field.CHECKBOX_FIELD
+        ]
+
+    def form_field(self):
+        from formly.models import get_field_class
+        field_class, field_kwargs = get_field_class(self, list(self.choices))
+        return field_class(**field_kwargs)
+
+    def to_dict(self):
+        data = self._asdict()
+        data["choices"] = [list(choice) for choice in self.choices]
+        data["targets"] = [[choice_pk, target.to_dict()] for choice_pk, target in self.targets]
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        data = dict(data)
+        data["choices"] = tuple(tuple(choice) for choice in data["choices"])
+        data["targets"] = tuple(
+            (choice_pk, cls.from_dict(target)) for choice_pk, target in data["targets"]
+        )
+        return cls(**data)
+
+
+class PageSpec(namedtuple("PageSpec", [
+    "pk",
+    "survey_id",
+    "page_num",
+    "subtitle",
+    "target_id",
+    "fields",
+    "has_media",
+])):
+    """
+    Immutable description of a `Page` and its compiled fields. It exposes
+    the `Page` attributes the run views and templates rely on.
+    """
+    __slots__ = ()
+
+    def __str__(self):
+        return self.label()
+
+    def label(self):
+        if self.subtitle:
+            return self.subtitle
+        else:
+            return "Page %d" % self.page_num
+
+    def to_dict(self):
+        data = self._asdict()
+        data["fields"] = [field.to_dict() for field in self.fields]
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        data = dict(data)
+        data["fields"] = tuple(FieldSpec.from_dict(field) for field in data["fields"])
+        return cls(**data)
+
+
+def _cache():
+    return caches[settings.FORMLY_SPEC_CACHE]
+
+
+def _page_key(page_pk, version, using):
+    design_version, created = version
+    return "formly:page-spec:{}:{}:{}:{}".format(using, page_pk, design_version, created.isoformat())
+
+
+def _pages_key(survey_pk, version, using):
+    design_version, created = version
+    return "formly:survey-pages:{}:{}:{}:{}".format(using, survey_pk, design_version, created.isoformat())
+
+
+def survey_spec_version(survey_pk, using="default"):
+    """
+    Return the `(design_version, created)` pair specs of a survey are keyed
+    on; `created` keeps a reused primary key from serving a stale entry.
+    """
+    from formly.models import Survey
+
+    return Survey.objects.using(using).values_list("design_version", "created").get(pk=survey_pk)
+
+
+def invalidate_survey_specs(survey_pk, using="default"):
+    """
+    Bump the design version of a survey so every compiled page spec built
+    from the previous design is ignored from now on, by every process.
+    """
+    from formly.models import Survey
+
+    Survey.objects.using(using).filter(pk=survey_pk).update(design_version=F("design_version") + 1)
+
+
+def invalidate_scale_specs(scale_pk, using="default"):
+    """
+    Bump the design version of every survey with a question on the
+    `OrdinalScale` with `scale_pk`
+    """
+    from formly.models import Field, Survey
+
+    Survey.objects.using(using).filter(
+        pk__in=Field.objects.using(using).filter(scale_id=scale_pk).values("survey")
+    ).update(design_version=F("design_version") + 1)
+
+
+def build_field_spec(field):
+    """
+    Compile a `Field` into a `FieldSpec`, relying on prefetched `choices`
+    and `choices__target` when they are available and on the scale registry
+    for Likert and rating choices.
+    """
+    from formly.models import Field
+    from formly.utils.scales import scale_registry
+
+    if field.field_type in [Field.LIKERT_FIELD, Field.RATING_FIELD]:
+        scale_choices = scale_registry(field._state.db or "default").scale_choices(field.scale_id)
+        choices = tuple((x.pk, x.label) for x in scale_choices)
+        field_choices = []
+    else:
+        field_choices = list(field.choices.all())
+        choices = tuple((x.pk, x.label) for x in field_choices)
+
+    targets = tuple(
+        (choice.pk, build_field_spec(choice.target))
+        for choice in field_choices
+        if choice.target_id is not None
+    )
+    return FieldSpec(
+        pk=field.pk,
+        name=field.name,
+        label=field.label,
+        help_text=field.help_text,
+        field_type=field.field_type,
+        required=field.required,
+        maximum_choices=field.maximum_choices,
+        expected_answers=field.expected_answers,
+        choices=choices,
+        targets=targets,
+    )
+
+
+def build_page_spec(page, fields=None):
+    """
+    Compile a `Page` into a `PageSpec`. `fields` may hold the page's fields,
+    in order and loaded with `Field.objects.with_choices()`, to avoid
+    fetching them again.
+    """
+    from formly.models import Field
+
+    if fields is None:
+        fields = page.fields.with_choices()
+    field_specs = tuple(build_field_spec(field) for field in fields)
+
+    has_media = any(
+        spec.field_type == Field.MEDIA_FIELD or any(
+            target.field_type == Field.MEDIA_FIELD for _, target in spec.targets
+        )
+        for spec in field_specs
+    )
+    return PageSpec(
+        pk=page.pk,
+        survey_id=page.survey_id,
+        page_num=page.page_num,
+        subtitle=page.subtitle,
+        target_id=page.target_id,
+        fields=field_specs,
+        has_media=has_media
+    )
+
+
+def get_page_spec(page, survey=None):
+    """
+    Return the compiled `PageSpec` for a page, looking in the in-process
+    cache first, then Django's cache framework, and only compiling it from
+    the design tables when neither holds the current version. Passing the
+    page's `survey`, freshly loaded, saves reading its design version.
+    """
+    from formly.utils.scales import scale_registry
+
+    if isinstance(page, PageSpec):
+        return page
+
+    using = page._state.db or "default"
+    if survey is not None:
+        version = (survey.design_version, survey.created)
+    else:
+        version = survey_spec_version(page.survey_id, using)
+    key = _page_key(page.pk, version, using)
+    spec = _local_specs.get(key)
+    if spec is not None:
+        return spec
+
+    cache = _cache()
+    spec = cache.get(key)
+    if spec is None:
+        # The spec outlives the registry, so compile it from current scales
+        scale_registry(using, max_age=0)
+        spec = build_page_spec(page)
+        cache.set(key, spec, settings.FORMLY_SPEC_CACHE_TIMEOUT)
+
+    if len(_local_specs) >= settings.FORMLY_SPEC_LOCAL_CACHE_SIZE:
+        _local_specs.clear()
+    _local_specs[key] = spec
+    return spec
+
+
+def get_page_pks(survey):
+    """
+    Return the primary keys of the pages `survey`, freshly loaded, has in
+    its current design, cached like the page specs so that walking a
+    published snapshot does not read the pages table on every request.
+    """
+    using = survey._state.db or "default"
+    key = _pages_key(survey.pk, (survey.design_version, survey.created), using)
+    pks = _local_specs.get(key)
+    if pks is not None:
+        return pks
+
+    cache = _cache()
+    pks = cache.get(key)
+    if pks is None:
+        pks = frozenset(survey.pages.values_list("pk", flat=True))
+        cache.set(key, pks, settings.FORMLY_SPEC_CACHE_TIMEOUT)
+
+    if len(_local_specs) >= settings.FORMLY_SPEC_LOCAL_CACHE_SIZE:
+        _local_specs.clear()
+    _local_specs[key] = pks
+    return pks
@@ -12,6 +12,8 @@ from formly.forms.design import (
     SurveyCreateForm,
 )
 from formly.models import Field, FieldChoice, OrdinalScale, Page, Survey
+from formly.utils.instrumentation import instrumented
+from formly.utils.scales import scale_registry
 from formly.utils.views import BaseDeleteView
 
 try:
@@ -96,6 +98,7 @@ def survey_create(request):
 
 @require_POST
 @login_required
+@instrumented
 def survey_change_name(request, pk):
     """
     Works well with:
@@ -207,6 +210,7 @@ def page_update(request, pk):
 
 @require_POST
 @login_required
+@instrumented
 def field_move_up(request, pk):
     field = get_object_or_404(Field, pk=pk)
 
@@ -231,6 +235,7 @@ def field_move_up(request, pk):
 
 @require_POST
 @login_required
+@instrumented
 def field_move_down(request, pk):
     field = get_object_or_404(Field, pk=pk)
 
@@ -253,6 +258,33 @@ def field_move_down(request, pk):
     return JsonResponse(data)
 
 
+@require_POST
+@login_required
+@instrumented
+def field_reorder(request, pk):
+    page = get_object_or_404(Page, pk=pk)
+
+    if not request.user.has_perm("formly.edit_survey", obj=page.survey):
+        raise PermissionDenied()
+
+    try:
+        page.reorder_fields([int(field_pk) for field_pk in request.POST.getlist("fields")])
+    except ValueError:
+        return JsonResponse({"error": "Provide every field on the page exactly once."}, status=400)
+
+    data = {
+        "html": render_to_string(
+            "formly/design/_fields.html",
+            context={
+                "selected_page": page,
+                "fields": page.fields.all().order_by("ordinal"),
+            },
+            request=request
+        )
+    }
+    return JsonResponse(data)
+
+
 @require_POST
 @login_required
 def field_add_choice(request, pk):
@@ -289,6 +321,7 @@ def field_add_choice(request, pk):
 
 @require_POST
 @login_required
+@instrumented
 def likert_scale_set(request, field_pk, scale_pk):
     field = get_object_or_404(Field, pk=field_pk, field_type=Field.LIKERT_FIELD)
     scale = get_object_or_404(OrdinalScale, pk=scale_pk)
@@ -299,7 +332,7 @@ def likert_scale_set(request, field_pk, scale_pk):
             "formly/design/_likert_scales.html",
             context={
                 "selected_field": field,
-                "likert_scales": OrdinalScale.objects.filter(kind=OrdinalScale.ORDINAL_KIND_LIKERT)
+                "likert_scales": scale_registry().by_kind(OrdinalScale.ORDINAL_KIND_LIKERT)
             },
             request=request
         )
@@ -308,6 +341,7 @@ def likert_scale_set(request, field_pk, scale_pk):
 
 @require_POST
 @login_required
+@instrumented
 def likert_scale_create(request, field_pk):
     field = get_object_or_404(Field, pk=field_pk, field_type=Field.LIKERT_FIELD)
     likert_scale_form = OrdinalScaleForm(request.POST, balanced=True)
@@ -340,7 +374,7 @@ def likert_scale_create(request, field_pk):
                 "formly/design/_likert_scales.html",
                 context={
                     "selected_field": field,
-                    "likert_scales": OrdinalScale.objects.filter(kind=OrdinalScale.ORDINAL_KIND_LIKERT),
+                    "likert_scales": scale_registry().by_kind(OrdinalScale.ORDINAL_KIND_LIKERT),
                 },
                 request=request
             )
@@ -350,6 +384,7 @@ def likert_scale_create(request, field_pk):
 
 @require_POST
 @login_required
+@instrumented
 def rating_scale_set(request, field_pk, scale_pk):
     field = get_object_or_404(Field, pk=field_pk, field_type=Field.RATING_FIELD)
     scale = get_object_or_404(OrdinalScale, pk=scale_pk)
@@ -360,7 +395,7 @@ def rating_scale_set(request, field_pk, scale_pk):
             "formly/design/_rating_scales.html",
             context={
                 "selected_field": field,
-                "rating_scales": OrdinalScale.objects.filter(kind=OrdinalScale.ORDINAL_KIND_RATING)
+                "rating_scales": scale_registry().by_kind(OrdinalScale.ORDINAL_KIND_RATING)
             },
             request=request
         )
@@ -369,6 +404,7 @@ def rating_scale_set(request, field_pk, scale_pk):
 
 @require_POST
 @login_required
+@instrumented
 def rating_scale_create(request, field_pk):
     field = get_object_or_404(Field, pk=field_pk, field_type=Field.RATING_FIELD)
     rating_scale_form = OrdinalScaleForm(request.POST)
@@ -399,7 +435,7 @@ def rating_scale_create(request, field_pk):
                 "formly/design/_rating_scales.html",
                 context={
                     "selected_field": field,
-                    "rating_scales": OrdinalScale.objects.filter(kind=OrdinalScale.ORDINAL_KIND_RATING)
+                    "rating_scales": scale_registry().by_kind(OrdinalScale.ORDINAL_KIND_RATING)
                 },
                 request=request
             )
@@ -445,15 +481,16 @@ def field_update(request, pk):
             "selected_field": field,
             "field_form": form,
             "field_choice_form": field_choice_form,
-            "likert_scales": OrdinalScale.objects.filter(kind=OrdinalScale.ORDINAL_KIND_LIKERT),
+            "likert_scales": scale_registry().by_kind(OrdinalScale.ORDINAL_KIND_LIKERT),
             "likert_scale_form": likert_scale_form,
-            "rating_scales": OrdinalScale.objects.filter(kind=OrdinalScale.ORDINAL_KIND_RATING),
+            "rating_scales": scale_registry().by_kind(OrdinalScale.ORDINAL_KIND_RATING),
             "rating_scale_form": rating_scale_form
         })
 
 
 @require_POST
 @login_required
+@instrumented
 def choice_delete(request, pk):
     choice = get_object_or_404(FieldChoice, pk=pk)
     if not request.user.has_perm("formly.edit_survey", obj=choice.field.survey):
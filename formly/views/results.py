@@ -1,15 +1,26 @@
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.exceptions import PermissionDenied
-from django.http import HttpResponseRedirect, JsonResponse
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.http import (
+    Http404,
+    HttpResponseRedirect,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import get_object_or_404, render
 from django.urls import reverse
 from django.utils.encoding import uri_to_iri
 from django.utils.functional import cached_property
 from django.views.generic import DetailView
 
-from formly.models import Field, Survey
-from formly.utils.remapping import create_answer_list
+from formly.conf import settings
+from formly.models import Field, FieldResult, NormalizedAnswer, Survey
+from formly.utils.exporting import EXPORT_FORMATS, iter_export
+from formly.utils.instrumentation import phase
+from formly.utils.remapping import apply_mapping, normalize_answer
+from formly.utils.similarity import similar_answers
 
 
 @login_required
@@ -19,16 +30,73 @@ def survey_results(request, pk):
     if not request.user.has_perm("formly.view_results", obj=survey):
         raise PermissionDenied()
 
-    return render(
-        request,
-        "formly/results/home.html",
-        context={
-            "survey": survey,
-        })
+    page_size = settings.FORMLY_RESULTS_PAGE_SIZE
+    results = survey.results.select_related(
+        "result__user",
+        "page",
+        "question"
+    ).order_by("result", "question")
+    cursor = _parse_cursor(request.GET.get("after"))
+    if cursor is not None:
+        result_pk, question_pk = cursor
+        results = results.filter(
+            Q(result_id__gt=result_pk) | Q(result_id=result_pk, question_id__gt=question_pk)
+        )
+    with phase("survey_results", "query", request):
+        results = FieldResult.resolve_displays(list(results[:page_size + 1]))
+
+    next_cursor = None
+    if len(results) > page_size:
+        results = results[:page_size]
+        next_cursor = "{}-{}".format(results[-1].result_id, results[-1].question_id)
+
+    with phase("survey_results", "render", request):
+        return render(
+            request,
+            "formly/results/home.html",
+            context={
+                "survey": survey,
+                "results": results,
+                "next_cursor": next_cursor,
+            })
+
+
+@login_required
+def survey_results_export(request, pk, export_format):
+    survey = get_object_or_404(Survey, pk=pk)
+
+    if not request.user.has_perm("formly.view_results", obj=survey):
+        raise PermissionDenied()
+    if export_format not in EXPORT_FORMATS:
+        raise Http404()
+
+    response = StreamingHttpResponse(
+        iter_export(survey, export_format),
+        content_type=EXPORT_FORMATS[export_format]
+    )
+    response["Content-Disposition"] = 'attachment; filename="survey-{}-results.{}"'.format(survey.pk, export_format)
+    return response
+
+
+def _parse_cursor(value):
+    """
+    Parse a `<result pk>-<question pk>` keyset cursor
+    """
+    try:
+        result_pk, question_pk = value.split("-")
+        return int(result_pk), int(question_pk)
+    except (AttributeError, ValueError):
+        return None
+
+
+REMAP_ORDERINGS = {
+    "frequency": ["-count", "text"],
+    "text": ["text"],
+}
 
 
 class RemapView(LoginRequiredMixin, DetailView):
-    model = Field
+    queryset = Field.objects.select_related("statistics")
     context_object_name = "question"
     template_name = "formly/results/remap.html"
 
@@ -41,26 +109,45 @@ class RemapView(LoginRequiredMixin, DetailView):
     def get_context_data(self, **kwargs):
         context = super(RemapView, self).get_context_data(**kwargs)
 
-        field_results = self.object.results.all()
-        context["unmapped_results"] = sorted(create_answer_list(field_results))
+        # apply the answers saved since the index was last read
+        statistics = getattr(self.object, "statistics", None)
+        if statistics is not None and statistics.pending_answers:
+            NormalizedAnswer.refresh(self.object)
+
+        query = normalize_answer(self.request.GET.get("q", ""))
+        sort = self.request.GET.get("sort")
+        if sort not in REMAP_ORDERINGS:
+            sort = "frequency"
+        answers = self.object.normalized_answers.order_by(*REMAP_ORDERINGS[sort])
+        if query:
+            answers = answers.filter(text__contains=query)
+        similar = bool(self.request.GET.get("similar"))
+        if similar:
+            # spelling variants of the answer being remapped to, most similar first
+            answers = similar_answers(self.object, self.answer_string, answers=answers)
+
+        page = Paginator(answers, settings.FORMLY_REMAP_PAGE_SIZE).get_page(self.request.GET.get("page"))
+        context["unmapped_results"] = page.object_list
+        context["page_obj"] = page
+        context["query"] = query
+        context["sort"] = sort
+        context["similar"] = similar
         context["remap_answer"] = self.answer_string
         return context
 
     def post(self, request, *args, **kwargs):
         remapped_answers = request.POST.getlist("mapping")
+        # the answers listed on the submitted page; without them every
+        # previous mapping onto this answer is replaced
+        shown = set(request.POST.getlist("shown"))
         question = self.get_object()
-        mapping = dict([(remapped_answer, self.answer_string) for remapped_answer in remapped_answers])
-
-        for original_answer in question.mapping.keys():
-            mapped_answer = question.mapping[original_answer]
-            if mapped_answer == self.answer_string:
-                # remove previous mapping from question.mapping
-                del question.mapping[original_answer]
-
-        question.mapping.update(mapping)
-        question.save()
-        for result in question.results.all().select_related("question"):
-            result.save()
+        mapping = dict(
+            (original_answer, mapped_answer)
+            for original_answer, mapped_answer in question.mapping.items()
+            if mapped_answer != self.answer_string or (shown and original_answer not in shown)
+        )
+        mapping.update((remapped_answer, self.answer_string) for remapped_answer in remapped_answers)
+        apply_mapping(question, mapping)
 
         if request.is_ajax():
             return JsonResponse(question.mapping)
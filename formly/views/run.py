@@ -9,6 +9,8 @@ from django.template.loader import render_to_string
 from formly.forms.run import PageForm, TargetForm
 from formly.models import Field, FieldChoice, Survey
 from formly.utils.importing import load_path_attr
+from formly.utils.instrumentation import instrumented, phase
+from formly.utils.specs import get_page_spec
 
 COMPLETE_REDIRECT_CALLBACK = load_path_attr(getattr(
     settings,
@@ -17,40 +19,74 @@ COMPLETE_REDIRECT_CALLBACK = load_path_attr(getattr(
 ))
 
 
+# The phases of `take_survey`, shared with `formly.views.run_async`
+
+def next_page(request, survey):
+    with phase("take_survey", "next_page", request):
+        return survey.current_page(user=request.user)
+
+
+def build_page_form(request, survey, page):
+    with phase("take_survey", "form_build", request):
+        if request.method != "POST":
+            return PageForm(page=page, survey=survey)
+
+        kwargs = dict(data=request.POST, page=page, survey=survey)
+        if get_page_spec(page, survey=survey).has_media:
+            kwargs.update({"files": request.FILES})
+        return PageForm(**kwargs)
+
+
+def validate_page_form(request, form):
+    with phase("take_survey", "validation", request):
+        return form.is_valid()
+
+
+def save_page_form(request, form):
+    with phase("take_survey", "save", request):
+        return form.save(user=request.user)
+
+
+def render_page(request, survey, page, form):
+    with phase("take_survey", "render", request):
+        return render(
+            request,
+            "formly/run/page.html",
+            context={
+                "survey": survey,
+                "page": page,
+                "form": form
+            })
+
+
 @login_required
 def take_survey(request, pk):
     survey = get_object_or_404(Survey, pk=pk)
 
-    page = survey.next_page(user=request.user)
+    page = next_page(request, survey)
     if page is None:  # survey is complete
         return redirect(COMPLETE_REDIRECT_CALLBACK(survey))
 
-    if request.method == "POST":
-        kwargs = dict(data=request.POST, page=page)
-        if page.fields.filter(field_type=Field.MEDIA_FIELD).exists():
-            kwargs.update({"files": request.FILES})
+    form = build_page_form(request, survey, page)
+    if request.method == "POST" and validate_page_form(request, form):
+        save_page_form(request, form)
+        return redirect("formly:take_survey", pk=survey.pk)
 
-        form = PageForm(**kwargs)
-        if form.is_valid():
-            form.save(user=request.user)
-            return redirect("formly:take_survey", pk=survey.pk)
-    else:
-        form = PageForm(page=page)
+    return render_page(request, survey, page, form)
 
-    return render(
-        request,
-        "formly/run/page.html",
-        context={
-            "survey": survey,
-            "page": page,
-            "form": form
-        })
 
+def get_choice(pk):
+    return get_object_or_404(
+        FieldChoice.objects.select_related("field", "target__survey").prefetch_related("target__choices"),
+        pk=pk
+    )
 
-@login_required
-def choice_question(request, pk):
-    choice = get_object_or_404(FieldChoice, pk=pk)
 
+def answer_choice_question(request, choice):
+    """
+    Save a posted answer to the question revealed by `choice` and return the
+    JSON response with the question's html
+    """
     if request.method == "POST":
         kwargs = dict(data=request.POST, choice=choice)
         if choice.target.field_type == Field.MEDIA_FIELD:
@@ -70,3 +106,9 @@ def choice_question(request, pk):
             context={"form": form})
     }
     return HttpResponse(json.dumps(data), content_type="application/json")
+
+
+@login_required
+@instrumented
+def choice_question(request, pk):
+    return answer_choice_question(request, get_choice(pk))
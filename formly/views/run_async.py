@@ -0,0 +1,46 @@
+"""
+`async def` versions of the views in `formly.views.run` for ASGI
+deployments, used by `formly.urls` when `FORMLY_ASYNC_VIEWS` is enabled.
+
+The ORM is synchronous in the Django versions formly supports, so each view
+runs the whole of its synchronous counterpart, login check included, in one
+`sync_to_async(..., thread_sensitive=False)` call. That puts every request's
+database work on a worker thread of its own, with its own connection, so
+requests do not queue behind one another; the connection is closed around
+the call as Django does around a synchronous request.
+"""
+from functools import wraps
+
+from django.db import close_old_connections
+
+from asgiref.sync import sync_to_async
+
+from formly.views import run
+
+
+def _closing_connections(view_func):
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        close_old_connections()
+        try:
+            return view_func(request, *args, **kwargs)
+        finally:
+            close_old_connections()
+    return wrapper
+
+
+def in_worker_thread(view_func):
+    """
+    Serve the synchronous `view_func` from a coroutine view, running it on a
+    worker thread outside the one shared by thread-sensitive code
+    """
+    in_worker = sync_to_async(_closing_connections(view_func), thread_sensitive=False)
+
+    @wraps(view_func)
+    async def wrapper(request, *args, **kwargs):
+        return await in_worker(request, *args, **kwargs)
+    return wrapper
+
+
+take_survey = in_worker_thread(run.take_survey)
+choice_question = in_worker_thread(run.choice_question)
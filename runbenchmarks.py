@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+import argparse
+import os
+import sys
+
+import django
+
+from django.conf import settings
+
+from runtests import DEFAULT_SETTINGS
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Measure the cost of formly's hot paths.")
+    parser.add_argument("--pages", type=int)
+    parser.add_argument("--fields", type=int, help="Questions per page")
+    parser.add_argument("--choices", type=int, help="Choices per multiple choice question")
+    parser.add_argument("--respondents", type=int)
+    parser.add_argument("--only", nargs="*", help="Only run these benchmarks")
+    parser.add_argument("--memory-tolerance", type=float, default=0.5)
+    parser.add_argument(
+        "--time-tolerance",
+        type=float,
+        help="Also fail when wall time exceeds the baseline by this fraction"
+    )
+    parser.add_argument("--update-baseline", action="store_true")
+    return parser.parse_args(argv)
+
+
+def runbenchmarks(argv):
+    options = parse_args(argv)
+    if not settings.configured:
+        settings.configure(**DEFAULT_SETTINGS)
+
+    django.setup()
+
+    parent = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, parent)
+
+    from django.test.runner import DiscoverRunner
+    from formly.tests import benchmarks
+
+    size = benchmarks.DEFAULT_SIZE._replace(**dict(
+        (name, getattr(options, name))
+        for name in benchmarks.BenchmarkSize._fields
+        if getattr(options, name) is not None
+    ))
+
+    runner = DiscoverRunner(verbosity=0, interactive=False)
+    runner.setup_test_environment()
+    old_config = runner.setup_databases()
+    try:
+        results = benchmarks.run_benchmarks(size, only=options.only)
+    finally:
+        runner.teardown_databases(old_config)
+        runner.teardown_test_environment()
+
+    print("{:<20} {:>6} {:>8} {:>10} {:>10}".format("benchmark", "status", "queries", "seconds", "peak KiB"))
+    for name, measurement in results.items():
+        print("{:<20} {:>6} {:>8} {:>10} {:>10}".format(name, *measurement))
+
+    if options.update_baseline:
+        benchmarks.save_baseline(size, results)
+        print("Baseline written to {}".format(benchmarks.BASELINE_PATH))
+        return 0
+
+    regressions = benchmarks.compare(
+        size,
+        results,
+        benchmarks.load_baseline(),
+        memory_tolerance=options.memory_tolerance,
+        time_tolerance=options.time_tolerance
+    )
+    for regression in regressions:
+        print("REGRESSION {}".format(regression))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(runbenchmarks(sys.argv[1:]))
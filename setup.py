@@ -82,11 +82,15 @@ setup(
         "Topic :: Software Development :: Libraries :: Python Modules",
     ],
     install_requires=[
-        "django>=1.11",
+        "django>=2.2",
         "django-appconf>=1.0.2",
         "jsonfield>=2.0.2",
         "six>=1.15.0"
     ],
+    extras_require={
+        "analytics": ["numpy>=1.15"],
+        "parquet": ["pyarrow>=7.0"],
+    },
     tests_require=[
         "django-bootstrap-form>=3.0.0",
         "django-test-plus>=1.0.22",